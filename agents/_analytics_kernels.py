@@ -0,0 +1,59 @@
+"""
+Numeric kernels for analytics aggregation
+Compiled with Numba when it is installed, plain Python otherwise
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Fallback no-op decorator used when Numba is not installed"""
+        def decorator(func):
+            return func
+        return decorator
+
+
+@njit(cache=True)
+def summarize(
+    impressions: np.ndarray,
+    likes: np.ndarray,
+    comments: np.ndarray,
+    shares: np.ndarray,
+    rates: np.ndarray,
+    posts: np.ndarray
+):
+    """
+    Reduce per-platform metric arrays to summary totals in one pass
+
+    Args:
+        impressions: Total impressions per platform (int64)
+        likes: Total likes per platform (int64)
+        comments: Total comments per platform (int64)
+        shares: Total shares per platform (int64)
+        rates: Engagement rate per platform (float64)
+        posts: Posts published per platform (int64)
+
+    Returns:
+        Tuple of (total_impressions, total_engagement, avg_engagement_rate,
+        total_posts)
+    """
+    total_impressions = 0
+    total_engagement = 0
+    total_rate = 0.0
+    total_posts = 0
+
+    n = impressions.shape[0]
+    for i in range(n):
+        total_impressions += impressions[i]
+        total_engagement += likes[i] + comments[i] + shares[i]
+        total_rate += rates[i]
+        total_posts += posts[i]
+
+    avg_rate = total_rate / n if n > 0 else 0.0
+
+    return total_impressions, total_engagement, avg_rate, total_posts
@@ -0,0 +1,32 @@
+"""
+Bridge from the agents' synchronous entry points to their async versions
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, TypeVar
+
+T = TypeVar('T')
+
+
+def run_sync(coro: Awaitable[T]) -> T:
+    """
+    Run a coroutine to completion from synchronous code
+
+    asyncio.run cannot start inside a running event loop (Jupyter, an async
+    web handler), so in that case the coroutine runs on its own loop in a
+    worker thread. Async callers should await the *_async methods instead.
+
+    Args:
+        coro: Coroutine to run
+
+    Returns:
+        The coroutine's result
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
@@ -2,11 +2,81 @@
 Analytics Agent - Tracks performance and generates insights
 """
 
+import copy
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from loguru import logger
+import numpy as np
 import pandas as pd
-import json
+import orjson
+
+from agents._analytics_kernels import NUMBA_AVAILABLE, summarize
+
+
+# Sample payloads standing in for platform API responses; callers get deep
+# copies, so editing a report never changes another platform or report
+_PLATFORM_METRICS_TEMPLATE = {
+    'reach': {
+        'total_impressions': 45000,
+        'unique_reach': 28000,
+        'follower_growth': 1250
+    },
+    'engagement': {
+        'total_likes': 3200,
+        'total_comments': 485,
+        'total_shares': 320,
+        'engagement_rate': 4.2,
+        'clicks': 1850
+    },
+    'content': {
+        'posts_published': 28,
+        'avg_engagement_per_post': 143,
+        'best_performing_type': 'carousel',
+        'best_posting_time': '7:00 PM'
+    },
+    'audience': {
+        'top_demographics': {'25-34': 45, '35-44': 30, '18-24': 15},
+        'top_locations': ['New York', 'Los Angeles', 'Chicago'],
+        'active_hours': ['12-2 PM', '7-9 PM']
+    }
+}
+
+_TOP_POSTS_TEMPLATE = [
+    {
+        'platform': 'instagram',
+        'post_id': 'post_123',
+        'content': 'How to boost your productivity...',
+        'engagement': 523,
+        'reach': 12000,
+        'posted_at': '2024-12-15T14:00:00'
+    },
+    {
+        'platform': 'linkedin',
+        'post_id': 'post_456',
+        'content': '5 data-driven strategies...',
+        'engagement': 412,
+        'reach': 8500,
+        'posted_at': '2024-12-18T09:00:00'
+    }
+]
+
+# Numeric sections flattened into per-platform CSV rows, and their column dtypes
+_CSV_SECTIONS = ('reach', 'engagement', 'content')
+_CSV_DTYPES = {
+    'platform': 'category',
+    'total_impressions': 'int64',
+    'unique_reach': 'int64',
+    'follower_growth': 'int32',
+    'total_likes': 'int32',
+    'total_comments': 'int32',
+    'total_shares': 'int32',
+    'engagement_rate': 'float32',
+    'clicks': 'int32',
+    'posts_published': 'int32',
+    'avg_engagement_per_post': 'float32',
+    'best_performing_type': 'category',
+    'best_posting_time': 'category'
+}
 
 
 class AnalyticsAgent:
@@ -83,56 +153,33 @@ class AnalyticsAgent:
         # In production, would fetch from platform APIs
         # Returning sample data structure
         
-        return {
-            'reach': {
-                'total_impressions': 45000,
-                'unique_reach': 28000,
-                'follower_growth': 1250
-            },
-            'engagement': {
-                'total_likes': 3200,
-                'total_comments': 485,
-                'total_shares': 320,
-                'engagement_rate': 4.2,
-                'clicks': 1850
-            },
-            'content': {
-                'posts_published': 28,
-                'avg_engagement_per_post': 143,
-                'best_performing_type': 'carousel',
-                'best_posting_time': '7:00 PM'
-            },
-            'audience': {
-                'top_demographics': {'25-34': 45, '35-44': 30, '18-24': 15},
-                'top_locations': ['New York', 'Los Angeles', 'Chicago'],
-                'active_hours': ['12-2 PM', '7-9 PM']
-            }
-        }
+        return copy.deepcopy(_PLATFORM_METRICS_TEMPLATE)
     
     def _calculate_summary(self, platforms_data: Dict) -> Dict:
         """Calculate overall summary across platforms"""
         
-        total_impressions = sum(
-            p['reach']['total_impressions']
-            for p in platforms_data.values()
-        )
-        
-        total_engagement = sum(
-            p['engagement']['total_likes'] +
-            p['engagement']['total_comments'] +
-            p['engagement']['total_shares']
-            for p in platforms_data.values()
-        )
-        
-        avg_engagement_rate = sum(
-            p['engagement']['engagement_rate']
-            for p in platforms_data.values()
-        ) / len(platforms_data) if platforms_data else 0
-        
-        total_posts = sum(
-            p['content']['posts_published']
-            for p in platforms_data.values()
-        )
+        if NUMBA_AVAILABLE and platforms_data:
+            (total_impressions, total_engagement, avg_engagement_rate,
+             total_posts) = self._summarize_compiled(platforms_data)
+        else:
+            # Single pass over platforms, descending into each section once
+            total_impressions = total_engagement = total_posts = 0
+            total_engagement_rate = 0.0
+            
+            for p in platforms_data.values():
+                reach, engagement, content = p['reach'], p['engagement'], p['content']
+                total_impressions += reach['total_impressions']
+                total_engagement += (
+                    engagement['total_likes'] +
+                    engagement['total_comments'] +
+                    engagement['total_shares']
+                )
+                total_engagement_rate += engagement['engagement_rate']
+                total_posts += content['posts_published']
+            
+            avg_engagement_rate = (
+                total_engagement_rate / len(platforms_data) if platforms_data else 0
+            )
         
         return {
             'total_reach': total_impressions,
@@ -142,6 +189,29 @@ class AnalyticsAgent:
             'engagement_per_post': round(total_engagement / total_posts, 2) if total_posts else 0
         }
     
+    def _summarize_compiled(self, platforms_data: Dict) -> tuple:
+        """Run the summary reduction through the compiled kernel"""
+        
+        count = len(platforms_data)
+        counts = np.empty((5, count), dtype=np.int64)
+        rates = np.empty(count, dtype=np.float64)
+        
+        for i, p in enumerate(platforms_data.values()):
+            engagement = p['engagement']
+            counts[0, i] = p['reach']['total_impressions']
+            counts[1, i] = engagement['total_likes']
+            counts[2, i] = engagement['total_comments']
+            counts[3, i] = engagement['total_shares']
+            counts[4, i] = p['content']['posts_published']
+            rates[i] = engagement['engagement_rate']
+        
+        total_impressions, total_engagement, avg_rate, total_posts = summarize(
+            counts[0], counts[1], counts[2], counts[3], rates, counts[4]
+        )
+        
+        # Unbox to builtins so the report stays JSON-serialisable
+        return int(total_impressions), int(total_engagement), float(avg_rate), int(total_posts)
+    
     def _get_top_posts(
         self,
         platforms: List[str],
@@ -154,26 +224,7 @@ class AnalyticsAgent:
         # In production, would fetch actual post data
         # Returning sample structure
         
-        top_posts = [
-            {
-                'platform': 'instagram',
-                'post_id': 'post_123',
-                'content': 'How to boost your productivity...',
-                'engagement': 523,
-                'reach': 12000,
-                'posted_at': '2024-12-15T14:00:00'
-            },
-            {
-                'platform': 'linkedin',
-                'post_id': 'post_456',
-                'content': '5 data-driven strategies...',
-                'engagement': 412,
-                'reach': 8500,
-                'posted_at': '2024-12-18T09:00:00'
-            }
-        ]
-        
-        return top_posts[:limit]
+        return copy.deepcopy(_TOP_POSTS_TEMPLATE[:limit])
     
     def _generate_recommendations(self, report: Dict) -> List[str]:
         """Generate actionable recommendations based on data"""
@@ -198,11 +249,12 @@ class AnalyticsAgent:
             )
         
         # Platform-specific recommendations
-        for platform, data in report['platforms'].items():
-            best_time = data['content']['best_posting_time']
-            recommendations.append(
-                f"{platform.title()}: Continue posting around {best_time} for maximum engagement"
-            )
+        platform_titles = {platform: platform.title() for platform in report['platforms']}
+        recommendations.extend(
+            f"{platform_titles[platform]}: Continue posting around "
+            f"{data['content']['best_posting_time']} for maximum engagement"
+            for platform, data in report['platforms'].items()
+        )
         
         # Content type recommendations
         recommendations.append(
@@ -257,7 +309,9 @@ class AnalyticsAgent:
         self,
         report: Dict,
         format: str = 'json',
-        filepath: Optional[str] = None
+        filepath: Optional[str] = None,
+        level: str = 'summary',
+        chunked: bool = False
     ) -> str:
         """
         Export report to file
@@ -266,6 +320,10 @@ class AnalyticsAgent:
             report: Report dictionary
             format: Export format (json, csv, pdf)
             filepath: Output file path
+            level: CSV detail level ('summary' for the totals row,
+                'platforms' for one row per platform)
+            chunked: Stream JSON section by section instead of serialising
+                the whole report at once (same output, lower peak memory)
         
         Returns:
             Path to exported file
@@ -275,17 +333,84 @@ class AnalyticsAgent:
             filepath = f"reports/social_media_report_{timestamp}.{format}"
         
         if format == 'json':
-            with open(filepath, 'w') as f:
-                json.dump(report, f, indent=2)
+            # orjson emits UTF-8 bytes directly, so write in binary mode
+            with open(filepath, 'wb') as f:
+                if chunked:
+                    self._write_json_chunked(report, f)
+                else:
+                    f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2))
         
         elif format == 'csv':
             # Convert to DataFrame and export
-            df = pd.DataFrame([report['summary']])
+            if level == 'platforms':
+                df = self._platforms_frame(report['platforms'])
+            else:
+                df = pd.DataFrame([report['summary']])
             df.to_csv(filepath, index=False)
         
         logger.info(f"Report exported to {filepath}")
         return filepath
 
+    def _write_json_chunked(self, report: Dict, f):
+        """
+        Write report JSON one section entry at a time
+        
+        Produces the same bytes as orjson.dumps(report, option=OPT_INDENT_2),
+        but only one platform's metrics or one top post is serialised at a
+        time, so the full encoded document is never built in memory. The
+        report itself is still passed in whole.
+        """
+        def dumps(value, depth: int) -> bytes:
+            # Raw newlines only appear between tokens, never inside strings
+            return orjson.dumps(value, option=orjson.OPT_INDENT_2).replace(b'\n', b'\n' + b'  ' * depth)
+        
+        if not report:
+            f.write(b'{}')
+            return
+        
+        f.write(b'{')
+        for i, (key, value) in enumerate(report.items()):
+            if i:
+                f.write(b',')
+            f.write(b'\n  ' + orjson.dumps(key) + b': ')
+            
+            # Platforms and top posts are the large sections; split them further
+            if isinstance(value, dict) and value:
+                f.write(b'{')
+                for j, (item_key, item) in enumerate(value.items()):
+                    if j:
+                        f.write(b',')
+                    f.write(b'\n    ' + orjson.dumps(item_key) + b': ' + dumps(item, 2))
+                f.write(b'\n  }')
+            elif isinstance(value, list) and value:
+                f.write(b'[')
+                for j, item in enumerate(value):
+                    if j:
+                        f.write(b',')
+                    f.write(b'\n    ' + dumps(item, 2))
+                f.write(b'\n  ]')
+            else:
+                f.write(dumps(value, 1))
+        f.write(b'\n}')
+    
+    def _platforms_frame(self, platforms_data: Dict) -> pd.DataFrame:
+        """Flatten per-platform metrics into a typed DataFrame"""
+        
+        records = []
+        for platform, metrics in platforms_data.items():
+            record = {'platform': platform}
+            for section in _CSV_SECTIONS:
+                record.update(metrics.get(section, {}))
+            records.append(record)
+        
+        df = pd.DataFrame.from_records(records)
+        
+        # Narrow numeric dtypes and categorical labels keep the frame compact
+        return df.astype({
+            column: dtype for column, dtype in _CSV_DTYPES.items()
+            if column in df.columns
+        })
+
 
 if __name__ == "__main__":
     # Test analytics
@@ -299,7 +424,7 @@ if __name__ == "__main__":
         platforms=['instagram', 'linkedin', 'twitter']
     )
     
-    print(json.dumps(report['summary'], indent=2))
+    print(orjson.dumps(report['summary'], option=orjson.OPT_INDENT_2).decode())
     print(f"\nRecommendations:")
     for rec in report['recommendations']:
         print(f"- {rec}")
@@ -3,24 +3,77 @@ Content Creator Agent - Generates platform-optimized social media content
 Uses CrewAI framework for intelligent content generation
 """
 
-import json
+import asyncio
+import copy
+import hashlib
+import threading
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import ClassVar, Dict, List, Optional
 from loguru import logger
+import orjson
 
 from crewai import Agent, Task, Crew
 from langchain_openai import ChatOpenAI
 from langchain.tools import Tool
+from langchain_core.messages import HumanMessage, SystemMessage
 
+from agents._sync import run_sync
+from tools._llm import get_chat
 from tools.hashtag_generator import HashtagGenerator
 from tools.image_generator import ImagePromptGenerator
 
 
+# Platform-specific content specifications (read-only)
+_PLATFORM_SPECS = {
+    'instagram': {
+        'max_length': 2200,
+        'hashtag_count': 10,
+        'default_format': 'carousel',
+        'optimal_length': '125-150 words'
+    },
+    'linkedin': {
+        'max_length': 3000,
+        'hashtag_count': 5,
+        'default_format': 'article',
+        'optimal_length': '1300-2000 characters'
+    },
+    'twitter': {
+        'max_length': 280,
+        'hashtag_count': 2,
+        'default_format': 'text',
+        'optimal_length': '100-120 characters'
+    },
+    'facebook': {
+        'max_length': 63206,
+        'hashtag_count': 3,
+        'default_format': 'video',
+        'optimal_length': '40-80 characters'
+    }
+}
+
+
 class ContentCreatorAgent:
     """
     AI agent that creates engaging, platform-optimized social media content
     """
     
+    # Upper bound on simultaneous LLM generations per create_posts call
+    max_concurrent_posts = 8
+    
+    # Brand-independent resources shared by all instances, created on first use
+    _shared_llm: ClassVar[Optional[ChatOpenAI]] = None
+    _shared_hashtag_generator: ClassVar[Optional[HashtagGenerator]] = None
+    _shared_image_prompt_generator: ClassVar[Optional[ImagePromptGenerator]] = None
+    _shared_lock: ClassVar[threading.Lock] = threading.Lock()
+    
+    # Pillar distribution (percentages) used when the brand config has none
+    _DEFAULT_PILLARS = (
+        ('educational', 40),
+        ('inspirational', 20),
+        ('promotional', 20),
+        ('engagement', 20)
+    )
+    
     def __init__(self, brand_config: Dict):
         """
         Initialize content creator with brand configuration
@@ -29,17 +82,38 @@ class ContentCreatorAgent:
             brand_config: Brand configuration dictionary
         """
         self.brand_config = brand_config
-        self.llm = ChatOpenAI(model="gpt-4", temperature=0.7)
+        
+        # LLM client and tools carry no brand state, so instances share them
+        self._init_shared_resources()
+        self.llm = ContentCreatorAgent._shared_llm
         
         # Initialize tools
-        self.hashtag_generator = HashtagGenerator()
-        self.image_prompt_generator = ImagePromptGenerator()
+        self.hashtag_generator = ContentCreatorAgent._shared_hashtag_generator
+        self.image_prompt_generator = ContentCreatorAgent._shared_image_prompt_generator
         
         # Create CrewAI agents
         self._setup_agents()
         
+        # Build the post crew once; per-post values are passed as kickoff inputs
+        self._setup_post_crew()
+        self._crew_local = threading.local()
+        
+        # Parsed LLM output keyed by a hash of the rendered task description
+        self._kickoff_cache: Dict[str, object] = {}
+        
         logger.info("Content Creator Agent initialized")
     
+    @classmethod
+    def _init_shared_resources(cls):
+        """Create the shared LLM client and tools once per process"""
+        with cls._shared_lock:
+            if cls._shared_llm is None:
+                cls._shared_llm = get_chat("gpt-4", 0.7)
+            if cls._shared_hashtag_generator is None:
+                cls._shared_hashtag_generator = HashtagGenerator()
+            if cls._shared_image_prompt_generator is None:
+                cls._shared_image_prompt_generator = ImagePromptGenerator()
+    
     def _setup_agents(self):
         """Setup CrewAI agents for content creation"""
         
@@ -91,12 +165,66 @@ class ContentCreatorAgent:
             verbose=True
         )
     
+    def _setup_post_crew(self):
+        """Setup the reusable crew and task template for post generation"""
+        
+        # Placeholders are filled by CrewAI from the kickoff inputs
+        self._post_task = Task(
+            description="""Create a {platform} post for {brand_name}.
+            
+            Content Pillar: {pillar}
+            Brand Voice: {brand_voice}
+            Target Audience: {target_audience}
+            
+            Platform Requirements:
+            - Max Length: {max_length} characters
+            - Hashtags: {hashtag_count}
+            - Format: {content_format}
+            
+            Create engaging content that:
+            1. Hooks attention in the first sentence
+            2. Provides value to the audience
+            3. Includes a clear call-to-action
+            4. Matches the brand voice perfectly
+            5. Is optimized for {platform} algorithm
+            
+            Return in JSON format with keys: caption, hashtags, image_prompt, cta
+            """,
+            agent=self.copywriter,
+            expected_output="JSON object with post content"
+        )
+        
+        self._post_crew = Crew(
+            agents=[self.strategist, self.copywriter, self.visual_specialist],
+            tasks=[self._post_task],
+            verbose=False
+        )
+    
+    def _get_post_crew(self) -> Crew:
+        """Return the post crew owned by the current worker thread"""
+        
+        # CrewAI mutates task state during kickoff, so concurrent generations
+        # each need their own copy; one copy per thread is reused across posts
+        crew = getattr(self._crew_local, 'crew', None)
+        if crew is None:
+            crew = self._post_crew.copy()
+            self._crew_local.crew = crew
+        return crew
+    
+    async def _kickoff_one(self, inputs: Dict, semaphore: asyncio.Semaphore):
+        """Run a single post generation in a worker thread"""
+        async with semaphore:
+            return await asyncio.to_thread(
+                lambda: self._get_post_crew().kickoff(inputs=inputs)
+            )
+    
     def create_posts(
         self,
         platform: str,
         count: int = 1,
         content_type: Optional[str] = None,
-        target_date: Optional[datetime] = None
+        target_date: Optional[datetime] = None,
+        use_cache: bool = False
     ) -> List[Dict]:
         """
         Generate social media posts for specified platform
@@ -106,6 +234,40 @@ class ContentCreatorAgent:
             count: Number of posts to generate
             content_type: Specific content type (carousel, video, article, etc.)
             target_date: Target posting date
+            use_cache: Reuse posts generated earlier from identical prompts for
+                the same date (for explicit regeneration; off by default)
+        
+        Returns:
+            List of generated post dictionaries
+        """
+        return run_sync(self.create_posts_async(
+            platform=platform,
+            count=count,
+            content_type=content_type,
+            target_date=target_date,
+            use_cache=use_cache
+        ))
+    
+    async def create_posts_async(
+        self,
+        platform: str,
+        count: int = 1,
+        content_type: Optional[str] = None,
+        target_date: Optional[datetime] = None,
+        use_cache: bool = False,
+        semaphore: Optional[asyncio.Semaphore] = None
+    ) -> List[Dict]:
+        """
+        Generate social media posts concurrently (async version of create_posts)
+        
+        Args:
+            platform: Platform name (instagram, linkedin, twitter, facebook)
+            count: Number of posts to generate
+            content_type: Specific content type (carousel, video, article, etc.)
+            target_date: Target posting date
+            use_cache: Reuse posts generated earlier from identical prompts for
+                the same date (for explicit regeneration; off by default)
+            semaphore: Optional limit on concurrent generations, shared with other callers
         
         Returns:
             List of generated post dictionaries
@@ -118,94 +280,177 @@ class ContentCreatorAgent:
         # Get content pillar distribution
         pillars = self._get_content_pillars(count)
         
+        # Values shared by every post in this batch
+        base_inputs = {
+            'platform': platform,
+            'brand_name': self.brand_config['brand_name'],
+            'brand_voice': self.brand_config['brand_voice'],
+            'target_audience': self.brand_config['target_audience'],
+            'max_length': platform_specs['max_length'],
+            'hashtag_count': platform_specs['hashtag_count'],
+            'content_format': content_type or platform_specs['default_format']
+        }
+        
+        # Key each post by its rendered prompt and date; the occurrence number
+        # keeps repeated pillars within one batch from collapsing into one post
+        post_date = (target_date or datetime.now()).date().isoformat()
+        keys = []
+        occurrences = {}
+        for pillar in pillars:
+            occurrences[pillar] = occurrences.get(pillar, 0) + 1
+            description = self._post_task.description.format(**base_inputs, pillar=pillar)
+            keys.append(self._cache_key(description, post_date, occurrences[pillar]))
+        
+        generated = {}
+        pending = []
+        for i, key in enumerate(keys):
+            if use_cache and key in self._kickoff_cache:
+                generated[i] = self._kickoff_cache[key]
+            else:
+                pending.append(i)
+        
+        # Fan out the LLM calls; they are independent and network-bound
+        semaphore = semaphore or asyncio.Semaphore(self.max_concurrent_posts)
+        results = await asyncio.gather(
+            *[
+                self._kickoff_one({**base_inputs, 'pillar': pillars[i]}, semaphore)
+                for i in pending
+            ],
+            return_exceptions=True
+        )
+        
+        for i, result in zip(pending, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error generating post: {str(result)}")
+                continue
+            generated[i] = self._kickoff_cache[keys[i]] = self._parse_crew_output(result, platform)
+        
         posts = []
         
         for i, pillar in enumerate(pillars):
-            # Create task for content generation
-            task = Task(
-                description=f"""Create a {platform} post for {self.brand_config['brand_name']}.
-                
-                Content Pillar: {pillar}
-                Brand Voice: {self.brand_config['brand_voice']}
-                Target Audience: {self.brand_config['target_audience']}
-                
-                Platform Requirements:
-                - Max Length: {platform_specs['max_length']} characters
-                - Hashtags: {platform_specs['hashtag_count']}
-                - Format: {content_type or platform_specs['default_format']}
-                
-                Create engaging content that:
-                1. Hooks attention in the first sentence
-                2. Provides value to the audience
-                3. Includes a clear call-to-action
-                4. Matches the brand voice perfectly
-                5. Is optimized for {platform} algorithm
-                
-                Return in JSON format with keys: caption, hashtags, image_prompt, cta
-                """,
-                agent=self.copywriter,
-                expected_output="JSON object with post content"
-            )
+            if i not in generated:
+                continue
             
-            # Create crew and execute
-            crew = Crew(
-                agents=[self.strategist, self.copywriter, self.visual_specialist],
-                tasks=[task],
-                verbose=False
-            )
+            # Copy so metadata and caller edits never leak into the cache
+            post_data = copy.deepcopy(generated[i])
             
-            try:
-                result = crew.kickoff()
-                
-                # Parse result
-                post_data = self._parse_crew_output(result, platform)
-                
-                # Add metadata
-                post_data['platform'] = platform
-                post_data['content_pillar'] = pillar
-                post_data['scheduled_date'] = target_date or datetime.now()
-                post_data['status'] = 'draft'
-                
-                posts.append(post_data)
-                logger.success(f"Generated post {i+1}/{count} for {platform}")
-                
-            except Exception as e:
-                logger.error(f"Error generating post: {str(e)}")
-                continue
+            # Add metadata
+            post_data['platform'] = platform
+            post_data['content_pillar'] = pillar
+            post_data['scheduled_date'] = target_date or datetime.now()
+            post_data['status'] = 'draft'
+            
+            posts.append(post_data)
+            logger.success(f"Generated post {i+1}/{count} for {platform}")
         
         return posts
     
-    def _get_platform_specs(self, platform: str) -> Dict:
-        """Get platform-specific content specifications"""
+    def create_posts_batch(
+        self,
+        platforms: List[str],
+        target_date: Optional[datetime] = None
+    ) -> Dict[str, Dict]:
+        """
+        Generate one post per platform with a single LLM call
         
-        specs = {
-            'instagram': {
-                'max_length': 2200,
-                'hashtag_count': 10,
-                'default_format': 'carousel',
-                'optimal_length': '125-150 words'
-            },
-            'linkedin': {
-                'max_length': 3000,
-                'hashtag_count': 5,
-                'default_format': 'article',
-                'optimal_length': '1300-2000 characters'
-            },
-            'twitter': {
-                'max_length': 280,
-                'hashtag_count': 2,
-                'default_format': 'text',
-                'optimal_length': '100-120 characters'
-            },
-            'facebook': {
-                'max_length': 63206,
-                'hashtag_count': 3,
-                'default_format': 'video',
-                'optimal_length': '40-80 characters'
-            }
-        }
+        The brand preamble is sent once and the model returns a JSON object
+        keyed by platform. Platforms missing from the reply (or all of them,
+        if the call fails) fall back to concurrent create_posts_async calls.
+        
+        Args:
+            platforms: Platforms to generate for
+            target_date: Target posting date
+        
+        Returns:
+            Dict mapping platform to post dictionary
+        """
+        logger.info(f"Generating batched posts for {', '.join(platforms)}")
+        
+        pillar = self._get_content_pillars(1)[0]
+        platform_lines = "\n".join(
+            f"- {platform}: max {specs['max_length']} characters, {specs['hashtag_count']} hashtags, "
+            f"format {specs['default_format']}, optimal length {specs['optimal_length']}"
+            for platform, specs in ((p, self._get_platform_specs(p)) for p in platforms)
+        )
+        
+        messages = [
+            SystemMessage(content=f"""You are an award-winning social media copywriter for {self.brand_config['brand_name']}.
+            
+            Brand Voice: {self.brand_config['brand_voice']}
+            Target Audience: {self.brand_config['target_audience']}
+            
+            Every post must hook attention in the first sentence, provide value to the audience,
+            include a clear call-to-action, match the brand voice perfectly and be optimized
+            for its platform's algorithm."""),
+            HumanMessage(content=f"""Create one {pillar} post for each of these platforms:
+            {platform_lines}
+            
+            Return a JSON object keyed by platform name. Each value is an object with keys:
+            caption, hashtags, image_prompt, cta""")
+        ]
+        
+        generated = {}
+        try:
+            json_llm = self.llm.bind(response_format={"type": "json_object"})
+            data = orjson.loads(json_llm.invoke(messages).content)
+            
+            # Match keys case-insensitively; models sometimes capitalise them
+            by_name = {str(key).lower(): value for key, value in data.items()}
+            for platform in platforms:
+                value = by_name.get(platform.lower())
+                if isinstance(value, dict):
+                    generated[platform] = self._parse_crew_output(value, platform)
+        except Exception as e:
+            logger.warning(f"Batched generation failed: {str(e)}")
+        
+        posts = {}
+        for platform, post_data in generated.items():
+            post_data['platform'] = platform
+            post_data['content_pillar'] = pillar
+            post_data['scheduled_date'] = target_date or datetime.now()
+            post_data['status'] = 'draft'
+            posts[platform] = post_data
         
-        return specs.get(platform.lower(), specs['instagram'])
+        missing = [platform for platform in platforms if platform not in posts]
+        if missing:
+            logger.warning(f"Falling back to per-platform generation for {', '.join(missing)}")
+            posts.update(run_sync(self._create_first_posts(missing, target_date)))
+        
+        return {platform: posts[platform] for platform in platforms if platform in posts}
+    
+    async def _create_first_posts(
+        self,
+        platforms: List[str],
+        target_date: Optional[datetime]
+    ) -> Dict[str, Dict]:
+        """Generate one post per platform concurrently, skipping failures"""
+        
+        results = await asyncio.gather(
+            *[
+                self.create_posts_async(platform=platform, count=1, target_date=target_date)
+                for platform in platforms
+            ],
+            return_exceptions=True
+        )
+        
+        posts = {}
+        for platform, result in zip(platforms, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error generating {platform} post: {str(result)}")
+            elif result:
+                posts[platform] = result[0]
+        
+        return posts
+    
+    @staticmethod
+    def _cache_key(*parts) -> str:
+        """Build a stable cache key from prompt parts"""
+        raw = '\x1f'.join(str(part) for part in parts)
+        return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+    
+    def _get_platform_specs(self, platform: str) -> Dict:
+        """Get platform-specific content specifications"""
+        return _PLATFORM_SPECS.get(platform.lower(), _PLATFORM_SPECS['instagram'])
     
     def _get_content_pillars(self, count: int) -> List[str]:
         """
@@ -217,16 +462,14 @@ class ContentCreatorAgent:
         Returns:
             List of content pillar assignments
         """
-        pillars_config = self.brand_config.get('content_pillars', {
-            'educational': 40,
-            'inspirational': 20,
-            'promotional': 20,
-            'engagement': 20
-        })
+        pillars_config = self.brand_config.get('content_pillars')
+        pillar_items = (
+            pillars_config.items() if pillars_config is not None else self._DEFAULT_PILLARS
+        )
         
         # Convert percentages to counts
         pillar_list = []
-        for pillar, percentage in pillars_config.items():
+        for pillar, percentage in pillar_items:
             pillar_count = int(count * (percentage / 100))
             pillar_list.extend([pillar] * pillar_count)
         
@@ -236,29 +479,32 @@ class ContentCreatorAgent:
         
         return pillar_list[:count]
     
-    def _parse_crew_output(self, output: str, platform: str) -> Dict:
+    def _parse_crew_output(self, output, platform: str) -> Dict:
         """
         Parse CrewAI output into structured post data
         
         Args:
-            output: Raw output from CrewAI
+            output: Raw output from CrewAI, or an already-decoded post dict
             platform: Target platform
         
         Returns:
             Structured post dictionary
         """
         try:
+            # Already structured (e.g. an item of a parsed series)
+            if isinstance(output, dict):
+                data = output
             # Try to parse as JSON
-            if isinstance(output, str):
+            elif isinstance(output, str):
                 # Extract JSON from markdown code blocks if present
                 if '```json' in output:
                     json_str = output.split('```json')[1].split('```')[0].strip()
-                    data = json.loads(json_str)
+                    data = orjson.loads(json_str)
                 elif '```' in output:
                     json_str = output.split('```')[1].split('```')[0].strip()
-                    data = json.loads(json_str)
+                    data = orjson.loads(json_str)
                 else:
-                    data = json.loads(output)
+                    data = orjson.loads(output)
             else:
                 data = output
             
@@ -285,11 +531,20 @@ class ContentCreatorAgent:
                 'media': None
             }
     
+    @staticmethod
+    def _tag_series_post(post: Dict, platform: str, topic: str, number: int) -> Dict:
+        """Attach series metadata to a parsed post"""
+        post['platform'] = platform
+        post['series'] = topic
+        post['series_number'] = number
+        return post
+    
     def create_content_series(
         self,
         platform: str,
         topic: str,
-        count: int = 5
+        count: int = 5,
+        use_cache: bool = False
     ) -> List[Dict]:
         """
         Create a series of related posts on a specific topic
@@ -298,6 +553,7 @@ class ContentCreatorAgent:
             platform: Target platform
             topic: Series topic
             count: Number of posts in series
+            use_cache: Reuse a series previously generated from an identical prompt
         
         Returns:
             List of related posts
@@ -322,6 +578,11 @@ class ContentCreatorAgent:
             expected_output=f"JSON array of {count} posts"
         )
         
+        cache_key = self._cache_key(task.description)
+        if use_cache and cache_key in self._kickoff_cache:
+            logger.debug(f"Using cached series for '{topic}'")
+            return copy.deepcopy(self._kickoff_cache[cache_key])
+        
         crew = Crew(
             agents=[self.strategist, self.copywriter],
             tasks=[task],
@@ -333,18 +594,18 @@ class ContentCreatorAgent:
         # Parse series
         try:
             if isinstance(result, str):
-                series_data = json.loads(result)
+                series_data = orjson.loads(result)
             else:
                 series_data = result
             
-            posts = []
-            for i, post_data in enumerate(series_data):
-                post = self._parse_crew_output(json.dumps(post_data), platform)
-                post['platform'] = platform
-                post['series'] = topic
-                post['series_number'] = i + 1
-                posts.append(post)
+            posts = [
+                self._tag_series_post(
+                    self._parse_crew_output(post_data, platform), platform, topic, i
+                )
+                for i, post_data in enumerate(series_data, 1)
+            ]
             
+            self._kickoff_cache[cache_key] = copy.deepcopy(posts)
             return posts
             
         except Exception as e:
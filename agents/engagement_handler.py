@@ -2,15 +2,117 @@
 Engagement Handler Agent - Manages comments, DMs, and audience interactions
 """
 
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+import random
 import re
-import time
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from loguru import logger
+import orjson
 
-from langchain_openai import ChatOpenAI
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
+from aiohttp import web
+from langchain_core.messages import SystemMessage
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+
+from tools._llm import get_chat
+from tools.semantic_cache import SemanticCache
+
+
+# High-precision patterns checked before any LLM call. A comment is only
+# classified here when it is short and exactly one pattern matches;
+# everything else goes to the LLM. Spam gets hidden, so only unmistakable
+# self-promotion counts (not bare links, "DM" or topic words like crypto).
+_FAST_PATTERNS = {
+    'spam': re.compile(
+        r"\b(?:check (?:out )?my (?:page|profile|bio|channel)|follow (?:me|back) for|"
+        r"dm me for|link in my bio|(?:earn|make) \$\d[\d,]* (?:a|per) (?:day|week))\b",
+        re.IGNORECASE
+    ),
+    'complaint': re.compile(
+        r"\b(?:refund|money back|unacceptable|not working|doesn'?t work|"
+        r"(?:very|really|so|extremely) disappointed)\b|[\U0001F4A9\U0001F44E\U0001F621]",
+        re.IGNORECASE
+    ),
+    'positive': re.compile(
+        r"^\W*(?:love (?:this|it)|amazing|awesome|fantastic|excellent|brilliant|"
+        r"great (?:job|post|work)|thank you|thanks)\b|[\u2764\U0001F60D\U0001F44F\U0001F525\U0001F64C]",
+        re.IGNORECASE
+    ),
+    'question': re.compile(
+        r"\?\s*$|^\s*(?:how|what|when|where|why|which|can|could|does|do|is|are)\b(?!')",
+        re.IGNORECASE
+    )
+}
+
+# Longer comments tend to mix signals, so they always go to the model
+_FAST_PATH_MAX_LENGTH = 120
+
+# Platforms that can push comments to the webhook server; others are polled
+_WEBHOOK_PLATFORMS = ('instagram', 'facebook', 'twitter')
+
+# Labels produced by common sentiment models, normalised to
+# positive/neutral/negative
+_SENTIMENT_LABELS = {
+    'positive': 'positive', 'label_2': 'positive', 'pos': 'positive',
+    'neutral': 'neutral', 'label_1': 'neutral', 'neu': 'neutral',
+    'negative': 'negative', 'label_0': 'negative', 'neg': 'negative'
+}
+
+# Escalation keywords compiled into one case-insensitive pattern, so each
+# comment is scanned once instead of once per keyword
+_ESCALATION_KEYWORDS = (
+    'lawsuit', 'lawyer', 'refund', 'cancel',
+    'urgent', 'emergency', 'serious', 'manager'
+)
+_ESCALATION_RE = re.compile("|".join(re.escape(keyword) for keyword in _ESCALATION_KEYWORDS), re.IGNORECASE)
+
+
+# Task instructions. Each is appended to the same brand guidelines block so
+# every system message starts with an identical, cacheable prefix; the
+# per-call comment always goes last, in the human message.
+_CATEGORY_GUIDE = """Categories:
+- positive: Positive feedback, praise, appreciation
+- question: Asking for information or help
+- complaint: Negative feedback, dissatisfaction
+- spam: Promotional spam, irrelevant content"""
+
+# Labels a batch reply may use; anything else is classified again on its own
+_CATEGORIES = frozenset({'positive', 'question', 'complaint', 'spam'})
+
+_CLASSIFY_INSTRUCTIONS = f"""Task: classify the social media comment in the user message into one category.
+
+{_CATEGORY_GUIDE}
+
+Return only the category name."""
+
+_CLASSIFY_BATCH_INSTRUCTIONS = f"""Task: classify each numbered social media comment in the user message into one category.
+
+{_CATEGORY_GUIDE}
+
+Return a JSON array of category names, one per comment, in the same order as the comments."""
+
+_RESPONSE_INSTRUCTIONS = """Task: generate a friendly, helpful response to the social media comment in the user message.
+
+Requirements:
+- Keep it concise (1-2 sentences)
+- Match the brand voice
+- Be warm and authentic
+- Include user's name if appropriate
+- Don't over-promise
+
+Return only the response text."""
+
+_SENTIMENT_INSTRUCTIONS = """Task: analyze the sentiment of the text in the user message.
+
+Return JSON with:
+- sentiment: positive/neutral/negative
+- confidence: 0-1
+- emotion: primary emotion detected"""
 
 
 class EngagementAgent:
@@ -18,6 +120,26 @@ class EngagementAgent:
     AI agent that handles social media engagement and responses
     """
     
+    # Maximum number of comments classified in a single LLM call
+    classify_batch_size = 20
+    
+    # Upper bound on in-flight LLM calls across all monitored platforms
+    max_concurrent_llm_calls = 20
+    
+    # Queue consumers draining webhook comments
+    webhook_workers = 4
+    
+    # Praise matching at least this many positive keywords (and nothing
+    # else) gets the positive template instead of an LLM reply
+    template_min_keyword_hits = 2
+    positive_emoji = "\U0001F64C"
+    
+    # Polling backoff: halve the interval after a poll with new comments,
+    # grow it 1.5x after an empty one, within these bounds (seconds)
+    min_poll_interval = 10
+    max_poll_interval = 1800
+    poll_jitter = 0.2
+    
     def __init__(self, brand_config: Dict):
         """
         Initialize engagement handler
@@ -26,7 +148,7 @@ class EngagementAgent:
             brand_config: Brand configuration dictionary
         """
         self.brand_config = brand_config
-        self.llm = ChatOpenAI(model="gpt-4", temperature=0.6)
+        self.llm = get_chat("gpt-4", 0.6)
         
         # Engagement rules
         self.rules = {
@@ -56,8 +178,145 @@ class EngagementAgent:
             'after_hours': "Thanks for reaching out! We'll reply within 24 hours."
         }
         
+        # Optional on-device sentiment model that classifies most comments
+        # without an API call; the LLM only sees what it is unsure about
+        self._local_config = brand_config.get('engagement_rules', {}).get('local_classifier', {})
+        self._sentiment_pipeline = None
+        if self._local_config.get('enabled', False):
+            self._sentiment_pipeline = self._load_sentiment_pipeline(self._local_config)
+        
+        # Opt-in semantic cache so near-duplicate comments skip the LLM
+        cache_config = brand_config.get('engagement_rules', {}).get('semantic_cache', {})
+        self.semantic_cache = None
+        if cache_config.get('enabled', False):
+            self.semantic_cache = SemanticCache(
+                similarity_threshold=cache_config.get('similarity_threshold', 0.92),
+                ttl_seconds=cache_config.get('ttl_hours', 168) * 3600,
+                persist_path=cache_config.get('path', '.cache/engagement_semantic_cache.npz'),
+                embedding_backend=cache_config.get('embedding_backend', 'local')
+            )
+        
+        # Chains are built once and reused for every comment. System messages
+        # are passed as message objects (not templates) so the guidelines are
+        # byte-identical across calls and qualify for provider prompt caching.
+        guidelines = self._build_brand_guidelines()
+        self._classify_chain = self._build_chain(guidelines, _CLASSIFY_INSTRUCTIONS, "Comment: {comment}")
+        self._classify_batch_chain = self._build_chain(guidelines, _CLASSIFY_BATCH_INSTRUCTIONS, "{comments}")
+        self._respond_chain = self._build_chain(
+            guidelines, _RESPONSE_INSTRUCTIONS, "User Name: {user_name}\nComment: {comment}"
+        )
+        self._sentiment_chain = self._build_chain(guidelines, _SENTIMENT_INSTRUCTIONS, "Text: {text}")
+        
         logger.info("Engagement Agent initialized")
     
+    @staticmethod
+    def _load_sentiment_pipeline(local_config: Dict):
+        """
+        Load a transformers sentiment pipeline, if transformers is installed
+        
+        Args:
+            local_config: engagement_rules.local_classifier settings
+        
+        Returns:
+            Pipeline callable, or None when it cannot be loaded
+        """
+        model = local_config.get('model', 'cardiffnlp/twitter-roberta-base-sentiment-latest')
+        
+        try:
+            import torch
+            from transformers import pipeline
+        except ImportError:
+            logger.warning("transformers is not installed; using the LLM for classification")
+            return None
+        
+        # Half precision only pays off (and is only safe) on a GPU
+        if torch.cuda.is_available():
+            device, dtype = 0, torch.float16
+        else:
+            device, dtype = -1, torch.float32
+        
+        try:
+            sentiment_pipeline = pipeline(
+                "text-classification",
+                model=model,
+                device=device,
+                torch_dtype=dtype,
+                batch_size=local_config.get('batch_size', 32),
+                truncation=True
+            )
+        except Exception as e:
+            logger.warning(f"Could not load local classifier {model}: {str(e)}")
+            return None
+        
+        logger.info(f"Local classifier loaded: {model}")
+        return sentiment_pipeline
+    
+    def _build_chain(self, guidelines: str, instructions: str, human_template: str):
+        """
+        Build a prompt | llm | parser chain with a static system prefix
+        
+        Args:
+            guidelines: Brand guidelines shared by every prompt
+            instructions: Task-specific instructions
+            human_template: Template for the per-call user message
+        
+        Returns:
+            Runnable returning the model output as a string
+        """
+        prompt = ChatPromptTemplate.from_messages([
+            SystemMessage(content=f"{guidelines}\n\n{instructions}"),
+            ("human", human_template)
+        ])
+        return prompt | self.llm | StrOutputParser()
+    
+    @staticmethod
+    def _as_text(value) -> str:
+        """Render a config value that may be a list or a single string"""
+        
+        return value if isinstance(value, str) else ', '.join(value)
+    
+    def _build_brand_guidelines(self) -> str:
+        """
+        Render the static brand guidelines shared by every prompt
+        
+        Returns:
+            Guidelines text, constant for the lifetime of the agent
+        """
+        config = self.brand_config
+        lines = [
+            "You manage social media engagement for a brand.",
+            "",
+            f"Brand: {config.get('brand_name', 'our brand')}",
+            f"Brand Voice: {config['brand_voice']}"
+        ]
+        
+        if config.get('industry'):
+            lines.append(f"Industry: {config['industry']}")
+        if config.get('tone'):
+            lines.append(f"Tone: {self._as_text(config['tone'])}")
+        if config.get('values'):
+            lines.append(f"Values: {self._as_text(config['values'])}")
+        
+        # target_audience may be a plain description or a mapping with demographics
+        audience = config.get('target_audience') or {}
+        demographics = audience if isinstance(audience, str) else audience.get('demographics')
+        if demographics:
+            lines.append(f"Audience: {demographics}")
+        
+        avoid_topics = config.get('compliance', {}).get('avoid_topics', [])
+        if avoid_topics:
+            lines.append(f"Never discuss: {', '.join(avoid_topics)}")
+        
+        response_goal = config.get('engagement_rules', {}).get('response_time_goal')
+        if response_goal:
+            lines.append(f"Response time goal: {response_goal}")
+        
+        lines.append("")
+        lines.append("Standard replies:")
+        lines.extend(f"- {name}: {template}" for name, template in self.templates.items())
+        
+        return "\n".join(lines)
+    
     def classify_comment(self, comment: str) -> str:
         """
         Classify comment type using LLM
@@ -68,25 +327,304 @@ class EngagementAgent:
         Returns:
             Classification (positive, question, complaint, spam)
         """
-        prompt = PromptTemplate(
-            input_variables=["comment"],
-            template="""Classify this social media comment into one category:
-            - positive: Positive feedback, praise, appreciation
-            - question: Asking for information or help
-            - complaint: Negative feedback, dissatisfaction
-            - spam: Promotional spam, irrelevant content
-            
-            Comment: {comment}
-            
-            Return only the category name."""
+        classification = self._classify_locally([comment])[0]
+        if classification is not None:
+            return classification
+        
+        if self.semantic_cache is None:
+            return self._classify_with_llm(comment)
+        
+        return self.semantic_cache.get_or_compute(
+            comment,
+            lambda: self._classify_with_llm(comment),
+            namespace='classification'
+        )
+    
+    async def aclassify_comment(self, comment: str) -> str:
+        """
+        Classify comment type using LLM without blocking the event loop
+        
+        Args:
+            comment: Comment text
+        
+        Returns:
+            Classification (positive, question, complaint, spam)
+        """
+        if self._sentiment_pipeline is None:
+            classification = self._fast_classify(comment)
+        else:
+            classification = (await asyncio.to_thread(self._classify_locally, [comment]))[0]
+        if classification is not None:
+            return classification
+        
+        if self.semantic_cache is None:
+            return await self._aclassify_with_llm(comment)
+        
+        return await self.semantic_cache.aget_or_compute(
+            comment,
+            lambda: self._aclassify_with_llm(comment),
+            namespace='classification'
         )
+    
+    @staticmethod
+    def _fast_classify(comment: str) -> Optional[str]:
+        """
+        Classify obvious comments with keyword patterns
+        
+        Args:
+            comment: Comment text
+        
+        Returns:
+            Classification, or None when zero or several categories match
+        """
+        if len(comment) > _FAST_PATH_MAX_LENGTH:
+            return None
+        
+        matches = [
+            category for category, pattern in _FAST_PATTERNS.items()
+            if pattern.search(comment)
+        ]
+        
+        if len(matches) == 1:
+            logger.debug(f"Fast-path classified comment as: {matches[0]}")
+            return matches[0]
+        
+        return None
+    
+    def _classify_locally(self, comments: List[str]) -> List[Optional[str]]:
+        """
+        Classify comments without the LLM
+        
+        Keyword patterns run first. When the local model is loaded, the
+        remaining comments go through it in one batch; confident positive
+        and negative scores map to positive and complaint, and neutral
+        comments that read as questions map to question.
+        
+        Args:
+            comments: Comment texts
+        
+        Returns:
+            Classifications, with None where the LLM is still needed
+        """
+        classifications = [self._fast_classify(comment) for comment in comments]
+        remaining = [i for i, label in enumerate(classifications) if label is None]
+        
+        if self._sentiment_pipeline is None or not remaining:
+            return classifications
+        
+        try:
+            predictions = self._sentiment_pipeline([comments[i] for i in remaining])
+        except Exception as e:
+            logger.warning(f"Local classifier failed: {str(e)}")
+            return classifications
+        
+        min_confidence = self._local_config.get('min_confidence', 0.85)
+        for i, prediction in zip(remaining, predictions):
+            if prediction['score'] < min_confidence:
+                continue
+            
+            sentiment = _SENTIMENT_LABELS.get(prediction['label'].lower())
+            if sentiment == 'positive':
+                classifications[i] = 'positive'
+            elif sentiment == 'negative':
+                classifications[i] = 'complaint'
+            elif sentiment == 'neutral' and _FAST_PATTERNS['question'].search(comments[i]):
+                classifications[i] = 'question'
+        
+        return classifications
+    
+    def _classify_with_llm(self, comment: str) -> str:
+        """Classify a single comment with the LLM, bypassing the cache"""
+        
+        classification = self._classify_chain.invoke({"comment": comment}).strip().lower()
+        
+        logger.debug(f"Classified comment as: {classification}")
+        return classification
+    
+    async def _aclassify_with_llm(self, comment: str) -> str:
+        """Async variant of _classify_with_llm"""
         
-        chain = LLMChain(llm=self.llm, prompt=prompt)
-        classification = chain.run(comment=comment).strip().lower()
+        classification = (await self._classify_chain.ainvoke({"comment": comment})).strip().lower()
         
         logger.debug(f"Classified comment as: {classification}")
         return classification
     
+    def classify_comments(self, comments: List[str]) -> List[str]:
+        """
+        Classify many comments with one LLM call per batch
+        
+        Args:
+            comments: Comment texts
+        
+        Returns:
+            Classifications in the same order as the comments
+        """
+        if len(comments) <= 1:
+            return [self.classify_comment(comment) for comment in comments]
+        
+        # Repeated comments ("Great post!") are classified once
+        unique = list(dict.fromkeys(comments))
+        if len(unique) < len(comments):
+            labels = dict(zip(unique, self.classify_comments(unique)))
+            return [labels[comment] for comment in comments]
+        
+        classifications, embeddings = self._lookup_classifications(comments)
+        pending = [i for i, label in enumerate(classifications) if label is None]
+        
+        for start in range(0, len(pending), self.classify_batch_size):
+            indices = pending[start:start + self.classify_batch_size]
+            labels = self._classify_batch([comments[i] for i in indices])
+            self._store_classifications(classifications, embeddings, indices, labels)
+        
+        return classifications
+    
+    async def aclassify_comments(
+        self,
+        comments: List[str],
+        semaphore: Optional[asyncio.Semaphore] = None
+    ) -> List[str]:
+        """
+        Classify many comments, running the batch calls concurrently
+        
+        Args:
+            comments: Comment texts
+            semaphore: Optional limit on concurrent LLM calls
+        
+        Returns:
+            Classifications in the same order as the comments
+        """
+        if len(comments) <= 1:
+            return [await self.aclassify_comment(comment) for comment in comments]
+        
+        # Repeated comments ("Great post!") are classified once
+        unique = list(dict.fromkeys(comments))
+        if len(unique) < len(comments):
+            labels = dict(zip(unique, await self.aclassify_comments(unique, semaphore=semaphore)))
+            return [labels[comment] for comment in comments]
+        
+        semaphore = semaphore or asyncio.Semaphore(self.max_concurrent_llm_calls)
+        classifications, embeddings = await asyncio.to_thread(self._lookup_classifications, comments)
+        pending = [i for i, label in enumerate(classifications) if label is None]
+        chunks = [
+            pending[start:start + self.classify_batch_size]
+            for start in range(0, len(pending), self.classify_batch_size)
+        ]
+        
+        async def classify_chunk(indices: List[int]) -> List[str]:
+            async with semaphore:
+                return await self._aclassify_batch([comments[i] for i in indices])
+        
+        all_labels = await asyncio.gather(*(classify_chunk(indices) for indices in chunks))
+        for indices, labels in zip(chunks, all_labels):
+            # Storing may write the cache to disk, so keep it off the loop
+            await asyncio.to_thread(self._store_classifications, classifications, embeddings, indices, labels)
+        
+        return classifications
+    
+    def _lookup_classifications(self, comments: List[str]):
+        """
+        Answer comments locally and from the semantic cache
+        
+        Args:
+            comments: Comment texts
+        
+        Returns:
+            Tuple of (classifications with None for misses, embeddings by index)
+        """
+        classifications = self._classify_locally(comments)
+        embeddings: Dict[int, object] = {}
+        remaining = [i for i, label in enumerate(classifications) if label is None]
+        
+        if self.semantic_cache is None or not remaining:
+            return classifications, embeddings
+        
+        try:
+            vectors = self.semantic_cache.embed_many([comments[i] for i in remaining])
+        except Exception as e:
+            logger.warning(f"Semantic cache embedding failed: {str(e)}")
+            return classifications, embeddings
+        
+        for i, embedding in zip(remaining, vectors):
+            embeddings[i] = embedding
+            classifications[i] = self.semantic_cache.lookup('classification', embedding)
+        
+        answered = len(comments) - sum(label is None for label in classifications)
+        if answered:
+            logger.debug(f"Answered {answered} of {len(comments)} comments without the LLM")
+        
+        return classifications, embeddings
+    
+    def _store_classifications(self, classifications, embeddings, indices, labels):
+        """Fill in batch results and add them to the semantic cache"""
+        
+        for i, label in zip(indices, labels):
+            classifications[i] = label
+            if i in embeddings:
+                self.semantic_cache.add('classification', embeddings[i], label)
+    
+    def _classify_batch(self, batch: List[str]) -> List[str]:
+        """Classify one batch, falling back to per-comment calls on a bad reply or label"""
+        
+        labels: List[Optional[str]] = [None] * len(batch)
+        try:
+            result = self._classify_batch_chain.invoke({"comments": self._number_comments(batch)})
+            labels = self._parse_batch_labels(result, len(batch)) or labels
+        except Exception as e:
+            logger.warning(f"Batch classification failed: {str(e)}")
+        
+        return [
+            label if label is not None else self._classify_with_llm(comment)
+            for comment, label in zip(batch, labels)
+        ]
+    
+    async def _aclassify_batch(self, batch: List[str]) -> List[str]:
+        """Async variant of _classify_batch"""
+        
+        labels: List[Optional[str]] = [None] * len(batch)
+        try:
+            result = await self._classify_batch_chain.ainvoke({"comments": self._number_comments(batch)})
+            labels = self._parse_batch_labels(result, len(batch)) or labels
+        except Exception as e:
+            logger.warning(f"Batch classification failed: {str(e)}")
+        
+        missing = [i for i, label in enumerate(labels) if label is None]
+        retried = await asyncio.gather(*(self._aclassify_with_llm(batch[i]) for i in missing))
+        for i, label in zip(missing, retried):
+            labels[i] = label
+        return labels
+    
+    @staticmethod
+    def _number_comments(batch: List[str]) -> str:
+        """Render a batch as numbered lines for the batch prompt"""
+        
+        return "\n".join(
+            f"Comment {i}: {comment}" for i, comment in enumerate(batch, 1)
+        )
+    
+    @staticmethod
+    def _parse_batch_labels(result: str, expected: int) -> Optional[List[Optional[str]]]:
+        """
+        Parse a batch classification reply
+        
+        Args:
+            result: Raw LLM output
+            expected: Number of comments in the batch
+        
+        Returns:
+            Classifications with None for any unknown label, or None if the
+            reply does not match the batch
+        """
+        # Tolerate prose or code fences around the array
+        labels = orjson.loads(result[result.index('['):result.rindex(']') + 1])
+        
+        if isinstance(labels, list) and len(labels) == expected:
+            logger.debug(f"Classified {expected} comments in one call")
+            labels = [str(label).strip().lower() for label in labels]
+            return [label if label in _CATEGORIES else None for label in labels]
+        
+        logger.warning(f"Batch classification returned {len(labels)} labels for {expected} comments")
+        return None
+    
     def generate_response(
         self,
         comment: str,
@@ -104,42 +642,120 @@ class EngagementAgent:
         Returns:
             Response text or None if no response needed
         """
+        handled, response = self._rule_response(comment, classification, user_name)
+        if handled:
+            return response
+        
+        if self.semantic_cache is None:
+            return self._generate_with_llm(comment, classification, user_name)
+        
+        # Replies are cached per classification as templates, so a similar
+        # comment from anyone reuses the reply with their own name
+        template = self.semantic_cache.get_or_compute(
+            comment,
+            lambda: self._reply_template(self._generate_with_llm(comment, classification, user_name), user_name),
+            namespace=f"response:{classification}"
+        )
+        return template.format(name=user_name)
+    
+    async def agenerate_response(
+        self,
+        comment: str,
+        classification: str,
+        user_name: str = "there"
+    ) -> Optional[str]:
+        """
+        Generate appropriate response to comment without blocking the event loop
+        
+        Args:
+            comment: Original comment
+            classification: Comment classification
+            user_name: Commenter's name
+        
+        Returns:
+            Response text or None if no response needed
+        """
+        handled, response = self._rule_response(comment, classification, user_name)
+        if handled:
+            return response
+        
+        if self.semantic_cache is None:
+            return await self._agenerate_with_llm(comment, classification, user_name)
+        
+        async def compute() -> str:
+            reply = await self._agenerate_with_llm(comment, classification, user_name)
+            return self._reply_template(reply, user_name)
+        
+        template = await self.semantic_cache.aget_or_compute(
+            comment,
+            compute,
+            namespace=f"response:{classification}"
+        )
+        return template.format(name=user_name)
+    
+    @staticmethod
+    def _reply_template(reply: str, user_name: str) -> str:
+        """Turn a reply into a str.format template with the commenter's name as {name}"""
+        
+        template = reply.replace('{', '{{').replace('}', '}}')
+        # The default "there" is an ordinary word, so leave generic replies as they are
+        if user_name == 'there':
+            return template
+        return re.sub(rf"(?<!\w){re.escape(user_name)}(?!\w)", '{name}', template)
+    
+    def _rule_response(self, comment: str, classification: str, user_name: str) -> Tuple[bool, Optional[str]]:
+        """
+        Apply the engagement rules that answer without the LLM
+        
+        Args:
+            comment: Comment text
+            classification: Comment classification
+            user_name: Commenter's name
+        
+        Returns:
+            Tuple of (handled, response); the LLM is only needed when not handled
+        """
         rule = self.rules.get(classification, {})
         
         if rule.get('action') == 'hide':
             logger.info("Hiding spam comment")
-            return None
+            return True, None
         
         if rule.get('action') == 'immediate_escalate':
             if rule.get('auto_acknowledge'):
-                return self.templates['complaint_ack'].format(name=user_name)
-            return None
+                return True, self.templates['complaint_ack'].format(name=user_name)
+            return True, None
         
-        # Generate personalized response
-        prompt = PromptTemplate(
-            input_variables=["comment", "brand_voice", "user_name"],
-            template="""Generate a friendly, helpful response to this social media comment.
-            
-            Brand Voice: {brand_voice}
-            User Name: {user_name}
-            Comment: {comment}
-            
-            Requirements:
-            - Keep it concise (1-2 sentences)
-            - Match the brand voice
-            - Be warm and authentic
-            - Include user's name if appropriate
-            - Don't over-promise
-            
-            Response:"""
-        )
+        if classification == 'positive' and self._is_obvious_praise(comment):
+            logger.debug("Answering obvious praise with the positive template")
+            return True, self.templates['positive'].format(name=user_name, emoji=self.positive_emoji)
+        
+        return False, None
+    
+    def _is_obvious_praise(self, comment: str) -> bool:
+        """True for comments that only match the positive pattern, several times"""
+        
+        if len(_FAST_PATTERNS['positive'].findall(comment)) < self.template_min_keyword_hits:
+            return False
         
-        chain = LLMChain(llm=self.llm, prompt=prompt)
-        response = chain.run(
-            comment=comment,
-            brand_voice=self.brand_config['brand_voice'],
-            user_name=user_name
+        return not any(
+            pattern.search(comment)
+            for category, pattern in _FAST_PATTERNS.items()
+            if category != 'positive'
         )
+    
+    def _generate_with_llm(self, comment: str, classification: str, user_name: str) -> str:
+        """Generate a personalised reply with the LLM, bypassing the cache"""
+        
+        response = self._respond_chain.invoke({"comment": comment, "user_name": user_name})
+        
+        logger.info(f"Generated response for {classification} comment")
+        return response.strip()
+    
+    async def _agenerate_with_llm(self, comment: str, classification: str, user_name: str) -> str:
+        """Async variant of _generate_with_llm"""
+        
+        response = await self._respond_chain.ainvoke({"comment": comment, "user_name": user_name})
         
         logger.info(f"Generated response for {classification} comment")
         return response.strip()
@@ -166,13 +782,7 @@ class EngagementAgent:
             return True
         
         # Check for escalation keywords
-        escalation_keywords = [
-            'lawsuit', 'lawyer', 'refund', 'cancel',
-            'urgent', 'emergency', 'serious', 'manager'
-        ]
-        
-        comment_lower = comment.lower()
-        if any(keyword in comment_lower for keyword in escalation_keywords):
+        if _ESCALATION_RE.search(comment):
             logger.warning(f"Escalation keyword detected in: {comment[:50]}")
             return True
         
@@ -202,6 +812,103 @@ class EngagementAgent:
         # Classify comment
         classification = self.classify_comment(comment)
         
+        return self._handle_classified(comment, user_name, platform, post_id, classification)
+    
+    async def aprocess_comment(
+        self,
+        comment: str,
+        user_name: str,
+        platform: str,
+        post_id: str
+    ) -> Dict:
+        """
+        Process a single comment without blocking the event loop
+        
+        Args:
+            comment: Comment text
+            user_name: Commenter's name
+            platform: Social media platform
+            post_id: ID of the post
+        
+        Returns:
+            Processing result dictionary
+        """
+        logger.info(f"Processing comment from {user_name} on {platform}")
+        
+        classification = await self.aclassify_comment(comment)
+        
+        return await self._ahandle_classified(comment, user_name, platform, post_id, classification)
+    
+    def process_comments(self, comments: List[Dict]) -> List[Dict]:
+        """
+        Process many comments, classifying them in batches
+        
+        Args:
+            comments: Dicts with comment, user_name, platform and post_id keys
+        
+        Returns:
+            Processing result dictionaries in the same order
+        """
+        if not comments:
+            return []
+        
+        logger.info(f"Processing {len(comments)} comments")
+        
+        classifications = self.classify_comments([c['comment'] for c in comments])
+        
+        return [
+            self._handle_classified(
+                c['comment'], c['user_name'], c['platform'], c['post_id'], classification
+            )
+            for c, classification in zip(comments, classifications)
+        ]
+    
+    async def aprocess_comments(
+        self,
+        comments: List[Dict],
+        semaphore: Optional[asyncio.Semaphore] = None
+    ) -> List[Dict]:
+        """
+        Process many comments concurrently, classifying them in batches
+        
+        Args:
+            comments: Dicts with comment, user_name, platform and post_id keys
+            semaphore: Optional limit on concurrent LLM calls, shared across platforms
+        
+        Returns:
+            Processing result dictionaries in the same order
+        """
+        if not comments:
+            return []
+        
+        logger.info(f"Processing {len(comments)} comments")
+        
+        semaphore = semaphore or asyncio.Semaphore(self.max_concurrent_llm_calls)
+        classifications = await self.aclassify_comments(
+            [c['comment'] for c in comments],
+            semaphore=semaphore
+        )
+        
+        async def handle(c: Dict, classification: str) -> Dict:
+            async with semaphore:
+                return await self._ahandle_classified(
+                    c['comment'], c['user_name'], c['platform'], c['post_id'], classification
+                )
+        
+        return list(await asyncio.gather(
+            *(handle(c, classification) for c, classification in zip(comments, classifications))
+        ))
+    
+    def _new_result(
+        self,
+        comment: str,
+        user_name: str,
+        platform: str,
+        post_id: str,
+        classification: str
+    ) -> Dict:
+        """Build the result dictionary for a classified comment"""
+        
         # Check if should escalate
         escalate = self.should_escalate(comment, classification)
         
@@ -219,73 +926,349 @@ class EngagementAgent:
         if escalate:
             logger.warning(f"Escalating {classification} comment to human")
             result['response'] = self.templates.get('complaint_ack', '').format(name=user_name)
-        else:
+        
+        return result
+    
+    def _handle_classified(
+        self,
+        comment: str,
+        user_name: str,
+        platform: str,
+        post_id: str,
+        classification: str
+    ) -> Dict:
+        """Escalate or respond to a comment that has already been classified"""
+        
+        result = self._new_result(comment, user_name, platform, post_id, classification)
+        
+        if not result['escalated']:
             # Generate auto-response
-            response = self.generate_response(comment, classification, user_name)
-            result['response'] = response
+            result['response'] = self.generate_response(comment, classification, user_name)
+        
+        return result
+    
+    async def _ahandle_classified(
+        self,
+        comment: str,
+        user_name: str,
+        platform: str,
+        post_id: str,
+        classification: str
+    ) -> Dict:
+        """Async variant of _handle_classified"""
+        
+        result = self._new_result(comment, user_name, platform, post_id, classification)
+        
+        if not result['escalated']:
+            result['response'] = await self.agenerate_response(comment, classification, user_name)
         
         return result
     
-    def monitor_comments(
+    async def monitor_comments(
         self,
         platform: str,
-        check_interval: int = 300
+        check_interval: int = 300,
+        semaphore: Optional[asyncio.Semaphore] = None
     ):
         """
-        Continuously monitor and respond to comments
+        Continuously poll for and respond to comments
+        
+        Used for platforms without webhook delivery, or for every platform
+        when webhooks are disabled. The interval starts at check_interval and
+        adapts to activity: it shrinks while comments keep arriving and grows
+        on empty or failed polls. Each sleep is jittered so platforms drift
+        apart instead of polling in lockstep.
         
         Args:
             platform: Platform to monitor
-            check_interval: Seconds between checks
+            check_interval: Initial seconds between checks
+            semaphore: Optional limit on concurrent LLM calls, shared across platforms
         """
         logger.info(f"Starting comment monitoring for {platform}")
         
-        # This would integrate with platform API
-        # For demo purposes, showing the logic
+        semaphore = semaphore or asyncio.Semaphore(self.max_concurrent_llm_calls)
+        interval = min(max(check_interval, self.min_poll_interval), self.max_poll_interval)
         
         while True:
+            new_comments = []
             try:
-                # Fetch new comments (placeholder)
-                # new_comments = platform_api.get_new_comments()
+                new_comments = await asyncio.to_thread(self._fetch_new_comments, platform)
                 
-                # Process each comment
-                # for comment_data in new_comments:
-                #     result = self.process_comment(
-                #         comment=comment_data['text'],
-                #         user_name=comment_data['user'],
-                #         platform=platform,
-                #         post_id=comment_data['post_id']
-                #     )
-                #
-                #     if result['response']:
-                #         # Post response
-                #         platform_api.reply_to_comment(
-                #             comment_id=comment_data['id'],
-                #             response=result['response']
-                #         )
+                # Classify the whole batch at once, then reply where needed
+                results = await self.aprocess_comments(new_comments, semaphore=semaphore)
+                await self._send_replies(new_comments, results)
                 
                 logger.debug(f"Checked {platform} for new comments")
-                time.sleep(check_interval)
                 
-            except KeyboardInterrupt:
-                logger.info("Stopping comment monitoring")
-                break
+            except asyncio.CancelledError:
+                logger.info(f"Stopping comment monitoring for {platform}")
+                raise
             except Exception as e:
                 logger.error(f"Error monitoring comments: {str(e)}")
-                time.sleep(check_interval)
+            
+            if new_comments:
+                interval = max(self.min_poll_interval, interval * 0.5)
+            else:
+                interval = min(self.max_poll_interval, interval * 1.5)
+            
+            delay = interval * random.uniform(1 - self.poll_jitter, 1 + self.poll_jitter)
+            logger.debug(f"Next {platform} check in {delay:.0f}s")
+            await asyncio.sleep(delay)
+    
+    def _fetch_new_comments(self, platform: str) -> List[Dict]:
+        """
+        Fetch comments posted since the last check
+        
+        Args:
+            platform: Platform to query
+        
+        Returns:
+            Dicts with comment, user_name, platform, post_id and comment_id keys
+        """
+        # This would integrate with platform API
+        # new_comments = platform_api.get_new_comments()
+        return []
     
-    def start_monitoring(self, platforms: List[str]):
+    def _reply_to_comment(self, platform: str, comment_data: Dict, response: str):
+        """
+        Post a reply to a comment
+        
+        Args:
+            platform: Platform the comment was made on
+            comment_data: Comment as returned by _fetch_new_comments
+            response: Reply text
+        """
+        # This would integrate with platform API
+        # platform_api.reply_to_comment(
+        #     comment_id=comment_data['comment_id'],
+        #     response=response
+        # )
+        logger.info(f"Replying on {platform} to {comment_data.get('user_name')}")
+    
+    def start_monitoring(self, platforms: List[str], check_interval: int = 300):
         """
         Start monitoring multiple platforms
         
         Args:
             platforms: List of platforms to monitor
+            check_interval: Initial seconds between checks (adapts per platform)
         """
         logger.info(f"Starting monitoring for platforms: {', '.join(platforms)}")
         
-        # In production, would use multi-threading or async
-        for platform in platforms:
-            self.monitor_comments(platform)
+        try:
+            asyncio.run(self._monitor_platforms(platforms, check_interval))
+        except KeyboardInterrupt:
+            logger.info("Stopping comment monitoring")
+    
+    async def _monitor_platforms(self, platforms: List[str], check_interval: int):
+        """
+        Monitor all platforms concurrently under one shared LLM limit
+        
+        With webhooks enabled, platforms that can push comments are served by
+        the webhook server and queue consumers; only the rest are polled.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent_llm_calls)
+        webhook_config = self.brand_config.get('engagement_rules', {}).get('webhooks', {})
+        
+        tasks = []
+        runner = None
+        polled = platforms
+        
+        if webhook_config.get('enabled', False):
+            self._webhook_queue = asyncio.Queue()
+            runner = await self._start_webhook_server(webhook_config)
+            
+            workers = webhook_config.get('workers', self.webhook_workers)
+            tasks.extend(self._webhook_consumer(semaphore) for _ in range(workers))
+            polled = [p for p in platforms if p.lower() not in _WEBHOOK_PLATFORMS]
+        
+        tasks.extend(
+            self.monitor_comments(platform, check_interval, semaphore=semaphore)
+            for platform in polled
+        )
+        
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            if runner is not None:
+                await runner.cleanup()
+    
+    async def _start_webhook_server(self, webhook_config: Dict) -> web.AppRunner:
+        """
+        Start the aiohttp server that receives platform webhooks
+        
+        Args:
+            webhook_config: engagement_rules.webhooks settings
+        
+        Returns:
+            Runner to clean up on shutdown
+        """
+        self._webhook_verify_token = os.getenv('WEBHOOK_VERIFY_TOKEN', '')
+        self._webhook_secrets = {
+            'meta': os.getenv('META_APP_SECRET', ''),
+            'twitter': os.getenv('TWITTER_API_SECRET', '')
+        }
+        if not all(self._webhook_secrets.values()):
+            logger.warning("Webhook signing secrets not fully configured; payloads for those platforms will be rejected")
+        
+        app = web.Application()
+        app.router.add_get('/webhooks/{platform}', self._webhook_verify)
+        app.router.add_post('/webhooks/{platform}', self._webhook_handler)
+        
+        runner = web.AppRunner(app)
+        await runner.setup()
+        
+        host = webhook_config.get('host', '127.0.0.1')
+        port = webhook_config.get('port', 8080)
+        await web.TCPSite(runner, host, port).start()
+        
+        logger.info(f"Listening for webhooks on {host}:{port}")
+        return runner
+    
+    async def _webhook_verify(self, request: web.Request) -> web.Response:
+        """Answer subscription challenges (Meta hub.challenge, Twitter CRC)"""
+        
+        query = request.query
+        
+        if 'hub.challenge' in query:
+            if query.get('hub.mode') == 'subscribe' and self._webhook_verify_token and hmac.compare_digest(
+                query.get('hub.verify_token', ''), self._webhook_verify_token
+            ):
+                return web.Response(text=query['hub.challenge'])
+            return web.Response(status=403)
+        
+        if 'crc_token' in query and self._webhook_secrets['twitter']:
+            digest = hmac.new(
+                self._webhook_secrets['twitter'].encode(),
+                query['crc_token'].encode(),
+                hashlib.sha256
+            ).digest()
+            return web.json_response({'response_token': f"sha256={base64.b64encode(digest).decode()}"})
+        
+        return web.Response(status=404)
+    
+    async def _webhook_handler(self, request: web.Request) -> web.Response:
+        """Acknowledge a webhook immediately and queue its comments"""
+        
+        platform = request.match_info['platform'].lower()
+        body = await request.read()
+        
+        if not self._valid_signature(platform, body, request.headers):
+            logger.warning(f"Rejected {platform} webhook with a bad signature")
+            return web.Response(status=401)
+        
+        try:
+            payload = orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return web.Response(status=400)
+        
+        comments = self._parse_webhook_payload(platform, payload)
+        for comment_data in comments:
+            self._webhook_queue.put_nowait(comment_data)
+        
+        if comments:
+            logger.debug(f"Queued {len(comments)} {platform} comments from webhook")
+        return web.Response(status=200)
+    
+    def _valid_signature(self, platform: str, body: bytes, headers) -> bool:
+        """Check the payload signature; without the platform's secret nothing is accepted"""
+        
+        if platform == 'twitter':
+            secret = self._webhook_secrets['twitter']
+            if not secret:
+                return False
+            digest = hmac.new(secret.encode(), body, hashlib.sha256).digest()
+            expected = f"sha256={base64.b64encode(digest).decode()}"
+            return hmac.compare_digest(headers.get('x-twitter-webhooks-signature', ''), expected)
+        
+        secret = self._webhook_secrets['meta']
+        if not secret:
+            return False
+        expected = f"sha256={hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()}"
+        return hmac.compare_digest(headers.get('X-Hub-Signature-256', ''), expected)
+    
+    @staticmethod
+    def _parse_webhook_payload(platform: str, payload: Dict) -> List[Dict]:
+        """
+        Extract new comments from a webhook payload
+        
+        Args:
+            platform: Platform from the webhook URL
+            payload: Decoded webhook body
+        
+        Returns:
+            Dicts with comment, user_name, platform, post_id and comment_id keys
+        """
+        comments = []
+        
+        if platform == 'twitter':
+            # Account Activity API: replies to our tweets, excluding our own
+            for event in payload.get('tweet_create_events', []):
+                user = event.get('user', {})
+                if not event.get('in_reply_to_status_id_str') or user.get('id_str') == payload.get('for_user_id'):
+                    continue
+                comments.append({
+                    'comment': event.get('text', ''),
+                    'user_name': user.get('screen_name', 'there'),
+                    'platform': 'twitter',
+                    'post_id': event['in_reply_to_status_id_str'],
+                    'comment_id': event.get('id_str')
+                })
+            return comments
+        
+        # Meta Graph API (Instagram and Facebook pages)
+        for entry in payload.get('entry', []):
+            for change in entry.get('changes', []):
+                value = change.get('value', {})
+                
+                if change.get('field') == 'comments':
+                    comments.append({
+                        'comment': value.get('text', ''),
+                        'user_name': value.get('from', {}).get('username', 'there'),
+                        'platform': platform,
+                        'post_id': value.get('media', {}).get('id', ''),
+                        'comment_id': value.get('id')
+                    })
+                elif change.get('field') == 'feed' and value.get('item') == 'comment' and value.get('verb') == 'add':
+                    comments.append({
+                        'comment': value.get('message', ''),
+                        'user_name': value.get('from', {}).get('name', 'there'),
+                        'platform': platform,
+                        'post_id': value.get('post_id', ''),
+                        'comment_id': value.get('comment_id')
+                    })
+        
+        return comments
+    
+    async def _webhook_consumer(self, semaphore: asyncio.Semaphore):
+        """Drain queued webhook comments in batches and reply"""
+        
+        queue = self._webhook_queue
+        
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.classify_batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            
+            try:
+                results = await self.aprocess_comments(batch, semaphore=semaphore)
+                await self._send_replies(batch, results)
+            except Exception as e:
+                logger.error(f"Error processing webhook comments: {str(e)}")
+            finally:
+                for _ in batch:
+                    queue.task_done()
+    
+    async def _send_replies(self, comments: List[Dict], results: List[Dict]):
+        """Post the generated replies concurrently"""
+        
+        await asyncio.gather(*(
+            asyncio.to_thread(
+                self._reply_to_comment, comment_data['platform'], comment_data, result['response']
+            )
+            for comment_data, result in zip(comments, results)
+            if result['response']
+        ))
     
     def analyze_sentiment(self, text: str) -> Dict:
         """
@@ -297,26 +1280,55 @@ class EngagementAgent:
         Returns:
             Sentiment analysis result
         """
-        prompt = PromptTemplate(
-            input_variables=["text"],
-            template="""Analyze the sentiment of this text.
-            
-            Text: {text}
-            
-            Return JSON with:
-            - sentiment: positive/neutral/negative
-            - confidence: 0-1
-            - emotion: primary emotion detected
-            
-            JSON:"""
-        )
+        if self._sentiment_pipeline is not None:
+            sentiment = self._local_sentiment(text)
+            if sentiment is not None:
+                return sentiment
+        
+        result = self._sentiment_chain.invoke({"text": text})
+        
+        return self._parse_sentiment(result)
+    
+    async def aanalyze_sentiment(self, text: str) -> Dict:
+        """
+        Analyze sentiment of comment or message without blocking the event loop
+        
+        Args:
+            text: Text to analyze
         
-        chain = LLMChain(llm=self.llm, prompt=prompt)
-        result = chain.run(text=text)
+        Returns:
+            Sentiment analysis result
+        """
+        if self._sentiment_pipeline is not None:
+            sentiment = await asyncio.to_thread(self._local_sentiment, text)
+            if sentiment is not None:
+                return sentiment
+        
+        result = await self._sentiment_chain.ainvoke({"text": text})
+        
+        return self._parse_sentiment(result)
+    
+    def _local_sentiment(self, text: str) -> Optional[Dict]:
+        """Score sentiment with the local model, None if it fails"""
+        
+        try:
+            prediction = self._sentiment_pipeline(text)[0]
+        except Exception as e:
+            logger.warning(f"Local sentiment failed: {str(e)}")
+            return None
+        
+        return {
+            'sentiment': _SENTIMENT_LABELS.get(prediction['label'].lower(), 'neutral'),
+            'confidence': round(float(prediction['score']), 3),
+            'emotion': 'unknown'
+        }
+    
+    @staticmethod
+    def _parse_sentiment(result: str) -> Dict:
+        """Parse the sentiment JSON, defaulting to neutral"""
         
         try:
-            import json
-            sentiment = json.loads(result)
+            sentiment = orjson.loads(result)
             return sentiment
         except:
             return {
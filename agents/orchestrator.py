@@ -3,12 +3,18 @@ Main Orchestrator for Social Media Agent System
 Coordinates all agents and manages workflow
 """
 
+import asyncio
+import copy
+import functools
 import os
+import threading
 import yaml
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from loguru import logger
 
+from agents._sync import run_sync
 from agents.content_creator import ContentCreatorAgent
 from agents.scheduler import SchedulerAgent
 from agents.engagement_handler import EngagementAgent
@@ -16,12 +22,50 @@ from agents.analytics import AnalyticsAgent
 from tools.brand_voice_checker import BrandVoiceValidator
 from tools.platform_apis import PlatformManager
 
+# Platform-specific posting frequency
+_POSTS_PER_DAY = {
+    'instagram': 2,  # 1 feed + 1 story/reel
+    'linkedin': 1,
+    'twitter': 3,
+    'facebook': 1
+}
+
+# libyaml-backed loader when available, pure-Python otherwise
+_YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_config(path: str, mtime: float) -> Dict:
+    """
+    Parse a YAML config, memoized by path and modification time
+    
+    Args:
+        path: Path to the YAML file
+        mtime: File modification time; a change invalidates the cache entry
+    
+    Returns:
+        Parsed configuration (shared; callers must copy before mutating)
+    """
+    with open(path, 'r') as f:
+        return yaml.load(f, Loader=_YamlLoader)
+
 
 class SocialMediaOrchestrator:
     """
     Main orchestrator that coordinates all social media agents
     """
     
+    # Upper bound on in-flight post generations while building a calendar
+    max_concurrent_generations = 16
+    
+    # Concurrent brand voice scoring calls during validation
+    max_validation_workers = 8
+    
+    # Worker threads used to schedule posts, and the per-platform cap on
+    # in-flight API calls so one platform's rate limit is not exceeded
+    max_scheduling_workers = 32
+    max_concurrent_per_platform = 4
+    
     def __init__(self, brand_config_path: str):
         """
         Initialize orchestrator with brand configuration
@@ -32,8 +76,9 @@ class SocialMediaOrchestrator:
         logger.info("Initializing Social Media Orchestrator")
         
         # Load brand configuration
-        with open(brand_config_path, 'r') as f:
-            self.brand_config = yaml.safe_load(f)
+        self.brand_config = copy.deepcopy(
+            _load_config(brand_config_path, os.path.getmtime(brand_config_path))
+        )
         
         # Initialize agents
         self.content_creator = ContentCreatorAgent(self.brand_config)
@@ -55,6 +100,23 @@ class SocialMediaOrchestrator:
         """
         Generate complete content calendar for specified days
         
+        Args:
+            days: Number of days to generate content for
+            platforms: List of platforms (default: all configured platforms)
+        
+        Returns:
+            Dictionary containing content calendar
+        """
+        return run_sync(self.generate_content_calendar_async(days=days, platforms=platforms))
+    
+    async def generate_content_calendar_async(
+        self,
+        days: int = 30,
+        platforms: Optional[List[str]] = None
+    ) -> Dict:
+        """
+        Generate complete content calendar, generating days and platforms concurrently
+        
         Args:
             days: Number of days to generate content for
             platforms: List of platforms (default: all configured platforms)
@@ -74,22 +136,50 @@ class SocialMediaOrchestrator:
             'posts': []
         }
         
-        # Generate posts for each day
-        for day_offset in range(days):
-            target_date = datetime.now() + timedelta(days=day_offset)
-            
-            # Generate platform-specific content
-            for platform in platforms:
-                daily_posts = self._generate_daily_posts(platform, target_date)
-                
-                # Validate brand voice
-                for post in daily_posts:
-                    if self.brand_validator.validate(post['content']):
-                        calendar['posts'].append(post)
-                    else:
-                        logger.warning(f"Post failed brand voice validation: {post['content'][:50]}...")
-                        # Regenerate or skip
-                        continue
+        # Generate platform-specific content for every day at once; the
+        # semaphore caps LLM calls across all of them
+        start_date = datetime.now()
+        semaphore = asyncio.Semaphore(self.max_concurrent_generations)
+        
+        # Bind each platform's name and daily count once, outside the day loop
+        generators = {
+            platform: functools.partial(
+                self.content_creator.create_posts_async,
+                platform=platform,
+                count=self._daily_post_count(platform),
+                use_cache=False,
+                semaphore=semaphore
+            )
+            for platform in platforms
+        }
+        
+        results = await asyncio.gather(
+            *[
+                generators[platform](target_date=start_date + timedelta(days=day_offset))
+                for day_offset in range(days)
+                for platform in platforms
+            ],
+            return_exceptions=True
+        )
+        
+        posts = []
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Error generating daily posts: {str(result)}")
+                continue
+            posts.extend(result)
+        
+        # Score every post in one concurrent batch, keeping calendar order
+        verdicts = await self.brand_validator.avalidate_batch(
+            [post['content'] for post in posts],
+            max_concurrency=self.max_validation_workers
+        )
+        
+        for post, is_valid in zip(posts, verdicts):
+            if is_valid:
+                calendar['posts'].append(post)
+            else:
+                logger.warning(f"Post failed brand voice validation: {post['content'][:50]}...")
         
         logger.success(f"Generated {len(calendar['posts'])} posts")
         return calendar
@@ -105,15 +195,7 @@ class SocialMediaOrchestrator:
         Returns:
             List of post dictionaries
         """
-        # Platform-specific posting frequency
-        posts_per_day = {
-            'instagram': 2,  # 1 feed + 1 story/reel
-            'linkedin': 1,
-            'twitter': 3,
-            'facebook': 1
-        }
-        
-        count = posts_per_day.get(platform.lower(), 1)
+        count = self._daily_post_count(platform)
         
         posts = self.content_creator.create_posts(
             platform=platform,
@@ -123,6 +205,12 @@ class SocialMediaOrchestrator:
         
         return posts
     
+    @staticmethod
+    def _daily_post_count(platform: str) -> int:
+        """Number of posts to generate per day for a platform"""
+        
+        return _POSTS_PER_DAY.get(platform.lower(), 1)
+    
     def schedule_all_posts(self, content_calendar: Dict) -> Dict:
         """
         Schedule all posts in the content calendar
@@ -141,39 +229,70 @@ class SocialMediaOrchestrator:
             'total': len(content_calendar['posts'])
         }
         
-        for post in content_calendar['posts']:
-            try:
-                # Determine optimal posting time
-                optimal_time = self.scheduler.get_optimal_time(
-                    platform=post['platform'],
-                    date=post['scheduled_date']
-                )
-                
-                # Schedule via platform API
+        posts = content_calendar['posts']
+        platform_limits = {
+            platform: threading.BoundedSemaphore(self.max_concurrent_per_platform)
+            for platform in {post['platform'] for post in posts}
+        }
+        
+        # API calls are network-bound, so fan them out over threads; map keeps
+        # the results in calendar order
+        with ThreadPoolExecutor(max_workers=self.max_scheduling_workers) as executor:
+            outcomes = executor.map(
+                lambda post: self._schedule_one(post, platform_limits[post['platform']]),
+                posts
+            )
+            
+            for post, entry in zip(posts, outcomes):
+                if entry is not None:
+                    results['scheduled'].append(entry)
+                else:
+                    results['failed'].append(post)
+        
+        logger.success(f"Scheduled {len(results['scheduled'])} posts, {len(results['failed'])} failed")
+        return results
+    
+    def _schedule_one(self, post: Dict, platform_limit: threading.BoundedSemaphore) -> Optional[Dict]:
+        """
+        Schedule a single calendar post
+        
+        Args:
+            post: Post from the content calendar
+            platform_limit: Semaphore capping concurrent calls to the post's platform
+        
+        Returns:
+            Scheduled entry, or None if scheduling failed
+        """
+        try:
+            # Determine optimal posting time
+            optimal_time = self.scheduler.get_optimal_time(
+                platform=post['platform'],
+                date=post['scheduled_date']
+            )
+            
+            # Schedule via platform API
+            with platform_limit:
                 scheduled = self.platform_manager.schedule_post(
                     platform=post['platform'],
                     content=post['content'],
                     media=post.get('media'),
                     scheduled_time=optimal_time
                 )
-                
-                if scheduled:
-                    results['scheduled'].append({
-                        'post_id': scheduled['id'],
-                        'platform': post['platform'],
-                        'time': optimal_time
-                    })
-                    logger.info(f"Scheduled {post['platform']} post for {optimal_time}")
-                else:
-                    results['failed'].append(post)
-                    logger.error(f"Failed to schedule post: {post['content'][:50]}...")
-                    
-            except Exception as e:
-                logger.error(f"Error scheduling post: {str(e)}")
-                results['failed'].append(post)
+            
+            if scheduled:
+                logger.info(f"Scheduled {post['platform']} post for {optimal_time}")
+                return {
+                    'post_id': scheduled['id'],
+                    'platform': post['platform'],
+                    'time': optimal_time
+                }
+            
+            logger.error(f"Failed to schedule post: {post['content'][:50]}...")
+            
+        except Exception as e:
+            logger.error(f"Error scheduling post: {str(e)}")
         
-        logger.success(f"Scheduled {len(results['scheduled'])} posts, {len(results['failed'])} failed")
-        return results
+        return None
     
     def run_engagement_monitoring(self, platforms: Optional[List[str]] = None):
         """
@@ -269,19 +388,29 @@ class SocialMediaOrchestrator:
         )
         
         return optimized
+    
+    def close(self):
+        """Finish queued posts and release the platform connection pool"""
+        
+        self.platform_manager.close()
+    
+    def __enter__(self) -> 'SocialMediaOrchestrator':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
 
 
 if __name__ == "__main__":
     # Example usage
-    orchestrator = SocialMediaOrchestrator("config/brand_profiles.yaml")
-    
-    # Generate 30-day content calendar
-    calendar = orchestrator.generate_content_calendar(days=30)
-    
-    # Schedule all posts
-    results = orchestrator.schedule_all_posts(calendar)
-    
-    # Start engagement monitoring
-    orchestrator.run_engagement_monitoring()
-    
-    print(f"✅ Scheduled {len(results['scheduled'])} posts across platforms")
+    with SocialMediaOrchestrator("config/brand_profiles.yaml") as orchestrator:
+        # Generate 30-day content calendar
+        calendar = orchestrator.generate_content_calendar(days=30)
+        
+        # Schedule all posts
+        results = orchestrator.schedule_all_posts(calendar)
+        
+        # Start engagement monitoring
+        orchestrator.run_engagement_monitoring()
+        
+        print(f"✅ Scheduled {len(results['scheduled'])} posts across platforms")
@@ -6,6 +6,7 @@ import pytz
 from datetime import datetime, time, timedelta
 from typing import Dict, List, Optional
 from loguru import logger
+import numpy as np
 import pandas as pd
 
 
@@ -44,8 +45,21 @@ class SchedulerAgent:
             ]
         }
         
+        # Weekday -> posting time per platform, resolved once so lookups are a
+        # single tuple index
+        self._weekly_times = {
+            platform: self._expand_week(times)
+            for platform, times in self.optimal_times.items()
+        }
+        self._default_week = self._expand_week([time(12, 0)])
+        
         logger.info("Scheduler Agent initialized")
     
+    @staticmethod
+    def _expand_week(times: List[time]) -> tuple:
+        """Map each weekday (Mon=0) to a time, cycling through the list"""
+        return tuple(times[day_index % len(times)] for day_index in range(7))
+    
     def get_optimal_time(
         self,
         platform: str,
@@ -63,12 +77,12 @@ class SchedulerAgent:
         Returns:
             Datetime with optimal posting time
         """
-        times = custom_times or self.optimal_times.get(platform.lower(), [time(12, 0)])
-        
         # Select time based on day of week
         day_index = date.weekday()
-        time_index = day_index % len(times)
-        selected_time = times[time_index]
+        if custom_times:
+            selected_time = custom_times[day_index % len(custom_times)]
+        else:
+            selected_time = self._weekly_times.get(platform.lower(), self._default_week)[day_index]
         
         # Combine date and time
         scheduled_datetime = datetime.combine(
@@ -98,28 +112,27 @@ class SchedulerAgent:
         """
         logger.info("Creating weekly posting schedule")
         
-        schedule = []
         start_date = datetime.now(self.timezone)
         
-        for platform in platforms:
-            count = posts_per_week.get(platform, 7)
-            
-            # Distribute posts across week
-            for i in range(count):
-                day_offset = (i * 7) // count
-                post_date = start_date + timedelta(days=day_offset)
-                
-                post_time = self.get_optimal_time(platform, post_date)
-                
-                schedule.append({
-                    'platform': platform,
-                    'date': post_date.date(),
-                    'time': post_time.time(),
-                    'datetime': post_time,
-                    'day_of_week': post_time.strftime('%A')
-                })
-        
-        df = pd.DataFrame(schedule)
+        # Distribute posts across week: post i of count lands on day (i * 7) // count
+        counts = np.array([posts_per_week.get(platform, 7) for platform in platforms], dtype=np.int64)
+        platform_ids = np.repeat(np.arange(len(platforms)), counts)
+        ranks = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        day_offsets = (ranks * 7) // np.repeat(counts, counts)
+        
+        # At most 7 distinct slots per platform, so resolve each slot once and
+        # fan it out to every post that shares it
+        slot_keys, slot_index = np.unique(platform_ids * 7 + day_offsets, return_inverse=True)
+        slots = []
+        for key in slot_keys.tolist():
+            post_date = start_date + timedelta(days=key % 7)
+            post_time = self.get_optimal_time(platforms[key // 7], post_date)
+            slots.append((post_date.date(), post_time.time(), post_time, post_time.strftime('%A')))
+        
+        slot_df = pd.DataFrame(slots, columns=['date', 'time', 'datetime', 'day_of_week'])
+        df = slot_df.iloc[slot_index].reset_index(drop=True)
+        df.insert(0, 'platform', np.array(platforms, dtype=object)[platform_ids])
+        
         df = df.sort_values('datetime')
         
         logger.success(f"Created schedule with {len(df)} posts")
@@ -186,29 +199,48 @@ class SchedulerAgent:
         """
         logger.info("Checking for scheduling conflicts")
         
-        # Sort by datetime
-        sorted_posts = sorted(scheduled_posts, key=lambda x: x['datetime'])
+        if not scheduled_posts:
+            return []
         
-        adjusted = []
-        last_post_time = {}
+        # Integer nanoseconds for every post in one conversion (UTC for aware
+        # datetimes, wall clock for naive ones), sorted stably by time
+        times_ns = pd.to_datetime(
+            [post['datetime'] for post in scheduled_posts], utc=True
+        ).as_unit('ns').asi8
+        order = np.argsort(times_ns, kind='stable')
+        sorted_posts = [scheduled_posts[i] for i in order]
+        times_ns = times_ns[order]
         
-        for post in sorted_posts:
-            platform = post['platform']
-            scheduled_time = post['datetime']
+        gap_ns = int(min_gap_hours * 3600 * 1e9)
+        slack_ns = 1800 * 10**9  # Extra half hour added to pushed posts
+        
+        platforms, groups = np.unique([post['platform'] for post in sorted_posts], return_inverse=True)
+        for group, platform in enumerate(platforms):
+            indices = np.flatnonzero(groups == group)
+            conflicts = np.diff(times_ns[indices]) < gap_ns
+            if not conflicts.any():
+                continue
             
-            if platform in last_post_time:
-                time_diff = (scheduled_time - last_post_time[platform]).total_seconds() / 3600
-                
-                if time_diff < min_gap_hours:
-                    # Adjust time
-                    adjustment = timedelta(hours=min_gap_hours - time_diff + 0.5)
-                    post['datetime'] = scheduled_time + adjustment
+            # A pushed post can create a new conflict with the next one, and a
+            # post between gap and gap + slack after its predecessor is left
+            # alone, so the adjustment is not a running maximum; walk the
+            # platform's posts in order from its first conflict
+            first = int(np.argmax(conflicts)) + 1
+            last_ns = int(times_ns[indices[first - 1]])
+            for i in indices[first:]:
+                scheduled_ns = int(times_ns[i])
+                if scheduled_ns - last_ns < gap_ns:
+                    # Adjust time to min_gap_hours (plus slack) after the previous post
+                    adjusted_ns = last_ns + gap_ns + slack_ns
+                    post = sorted_posts[i]
+                    post['datetime'] = post['datetime'] + timedelta(
+                        microseconds=(adjusted_ns - scheduled_ns) // 1000
+                    )
+                    scheduled_ns = adjusted_ns
                     logger.warning(f"Adjusted {platform} post time to avoid conflict")
-            
-            last_post_time[platform] = post['datetime']
-            adjusted.append(post)
+                last_ns = scheduled_ns
         
-        return adjusted
+        return sorted_posts
 
 
 if __name__ == "__main__":
@@ -6,17 +6,19 @@ Generate your first batch of social media posts
 
 import os
 import sys
-import json
 from datetime import datetime
 
+import orjson
+
 # Add project to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from agents.content_creator import ContentCreatorAgent
-
 def main():
     """Quick start demo"""
     
+    # Deferred so importing this module does not load langchain/openai
+    from agents.content_creator import ContentCreatorAgent
+    
     print("=" * 60)
     print("Social Media Agent - Quick Start Demo")
     print("=" * 60)
@@ -52,27 +54,21 @@ def main():
     # Generate sample posts for each platform
     platforms = ['instagram', 'linkedin', 'twitter']
     
-    all_posts = {}
+    print(f"Generating posts for {', '.join(p.title() for p in platforms)}...")
+    
+    # One LLM call for all platforms
+    try:
+        all_posts = creator.create_posts_batch(platforms, datetime.now())
+    except Exception as e:
+        print(f"✗ Error: {str(e)}\n")
+        all_posts = {}
     
     for platform in platforms:
-        print(f"Generating {platform.title()} post...")
-        
-        try:
-            posts = creator.create_posts(
-                platform=platform,
-                count=1,
-                target_date=datetime.now()
-            )
-            
-            if posts:
-                all_posts[platform] = posts[0]
-                print(f"✓ {platform.title()} post generated\n")
-            else:
-                print(f"✗ Failed to generate {platform} post\n")
-                
-        except Exception as e:
-            print(f"✗ Error: {str(e)}\n")
-            continue
+        if platform in all_posts:
+            print(f"✓ {platform.title()} post generated")
+        else:
+            print(f"✗ Failed to generate {platform} post")
+    print()
     
     # Display results
     print("\n" + "=" * 60)
@@ -92,8 +88,8 @@ def main():
     
     # Save to file
     output_file = 'sample_posts.json'
-    with open(output_file, 'w') as f:
-        json.dump(all_posts, f, indent=2, default=str)
+    with open(output_file, 'wb') as f:
+        f.write(orjson.dumps(all_posts, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
     
     print("\n" + "=" * 60)
     print(f"✓ Sample posts saved to: {output_file}")
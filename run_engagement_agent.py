@@ -6,30 +6,42 @@ Monitors and responds to social media interactions
 
 import os
 import sys
+import atexit
+import asyncio
 import argparse
 from datetime import datetime
 from loguru import logger
-from dotenv import load_dotenv
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from agents.engagement_handler import EngagementAgent
 import yaml
 
+# libyaml-backed loader when available, pure-Python otherwise
+_YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
 
 def setup_logging(log_file: str = "logs/engagement.log"):
     """Setup logging configuration"""
     os.makedirs("logs", exist_ok=True)
     
+    # enqueue=True hands writes and rotation to a background thread, so
+    # logging never blocks the monitoring event loop
     logger.add(
         log_file,
         rotation="1 day",
         retention="30 days",
+        compression="gz",
         level="INFO",
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}"
+        format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}",
+        enqueue=True,
+        backtrace=False,
+        diagnose=False
     )
     
+    # Flush queued messages before the interpreter exits
+    atexit.register(logger.complete)
+    
     logger.info("="* 60)
     logger.info("Starting Engagement Agent")
     logger.info("="* 60)
@@ -38,7 +50,7 @@ def setup_logging(log_file: str = "logs/engagement.log"):
 def load_config(config_path: str) -> dict:
     """Load brand configuration"""
     with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
+        config = yaml.load(f, Loader=_YamlLoader)
     return config
 
 
@@ -62,7 +74,7 @@ def main():
         '--interval',
         type=int,
         default=300,
-        help='Check interval in seconds (default: 300 = 5 minutes)'
+        help='Initial check interval in seconds; adapts to activity between 10s and 30min (default: 300 = 5 minutes)'
     )
     parser.add_argument(
         '--test-mode',
@@ -72,6 +84,10 @@ def main():
     
     args = parser.parse_args()
     
+    # Deferred so --help and argument errors return without loading the agent stack
+    from dotenv import load_dotenv
+    from agents.engagement_handler import EngagementAgent
+    
     # Setup
     setup_logging()
     load_dotenv()
@@ -116,9 +132,11 @@ def main():
             }
         ]
         
-        for comment_data in test_comments:
+        # Classify the batch together (repeats once), then answer concurrently
+        results = asyncio.run(agent.aprocess_comments(test_comments))
+        
+        for result in results:
             logger.info(f"\n{'='*60}")
-            result = agent.process_comment(**comment_data)
             
             print(f"\nUser: {result['user_name']}")
             print(f"Platform: {result['platform']}")
@@ -136,7 +154,7 @@ def main():
     logger.info("Press Ctrl+C to stop\n")
     
     try:
-        agent.start_monitoring(platforms=args.platforms)
+        agent.start_monitoring(platforms=args.platforms, check_interval=args.interval)
     except KeyboardInterrupt:
         logger.info("\n\nStopping engagement monitoring...")
         logger.success("Engagement agent stopped gracefully")
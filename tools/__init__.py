@@ -2,14 +2,28 @@
 Tools Package for Social Media Agent
 """
 
-from .platform_apis import PlatformManager
-from .brand_voice_checker import BrandVoiceValidator
-from .hashtag_generator import HashtagGenerator
-from .image_generator import ImagePromptGenerator
-
-__all__ = [
-    'PlatformManager',
-    'BrandVoiceValidator',
-    'HashtagGenerator',
-    'ImagePromptGenerator'
-]
+import importlib
+
+# Public name -> submodule; imported on first attribute access (PEP 562)
+_LAZY_IMPORTS = {
+    'PlatformManager': '.platform_apis',
+    'BrandVoiceValidator': '.brand_voice_checker',
+    'HashtagGenerator': '.hashtag_generator',
+    'ImagePromptGenerator': '.image_generator',
+    'SemanticCache': '.semantic_cache'
+}
+
+__all__ = list(_LAZY_IMPORTS)
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        module = importlib.import_module(_LAZY_IMPORTS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,197 @@
+"""
+Key-value cache for low-churn API metadata
+Shared through Redis when REDIS_URL is set, in-process otherwise
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import orjson
+from loguru import logger
+
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+
+class CacheStore:
+    """
+    Async cache-aside store for JSON-serialisable values
+
+    With Redis every worker process shares one copy of each entry, and a
+    Redis lock makes sure only one of them recomputes an expired entry. The
+    in-memory fallback gives the same behaviour within a single process.
+
+    Must be used from a single event loop.
+    """
+
+    def __init__(self, url: Optional[str] = None, lock_timeout: float = 10):
+        """
+        Initialize cache store
+
+        Args:
+            url: Redis URL, defaults to REDIS_URL; in-memory when unset
+            lock_timeout: Seconds a recompute may hold the key's lock
+        """
+        self.lock_timeout = lock_timeout
+
+        self._redis = None
+        self._memory: Dict[str, Tuple[float, Any]] = {}
+        # Per-key locks and how many callers hold or wait on each; a lock is
+        # dropped once nobody needs it, so the dict only tracks busy keys
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._lock_users: Dict[str, int] = {}
+
+        url = url if url is not None else os.getenv('REDIS_URL')
+        if url and REDIS_AVAILABLE:
+            self._redis = aioredis.Redis.from_url(url)
+            logger.info("Cache store using Redis")
+        elif url:
+            logger.warning("REDIS_URL set but redis is not installed, caching in memory")
+
+    async def get(self, key: str) -> Optional[Any]:
+        """
+        Return the value stored under a key
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Stored value, or None if missing or expired
+        """
+        if self._redis is not None:
+            try:
+                raw = await self._redis.get(key)
+                return orjson.loads(raw) if raw is not None else None
+            except Exception as e:
+                logger.warning(f"Redis get failed: {str(e)}")
+                return None
+
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._memory[key]
+            return None
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float):
+        """
+        Store a value under a key
+
+        Args:
+            key: Cache key
+            value: JSON-serialisable value
+            ttl: Lifetime in seconds
+        """
+        if self._redis is not None:
+            try:
+                # Milliseconds, so a sub-second TTL does not round down to 0
+                await self._redis.set(key, orjson.dumps(value), px=max(1, int(ttl * 1000)))
+            except Exception as e:
+                logger.warning(f"Redis set failed: {str(e)}")
+            return
+
+        self._memory[key] = (time.monotonic() + ttl, value)
+
+    async def get_or_set(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Optional[Any]]],
+        ttl: float
+    ) -> Optional[Any]:
+        """
+        Return the cached value, or compute and store it on a miss
+
+        Concurrent misses for one key wait for a single compute() rather
+        than all calling the upstream API.
+
+        Args:
+            key: Cache key
+            compute: Coroutine factory producing the value; None is not stored
+            ttl: Lifetime in seconds
+
+        Returns:
+            Cached or freshly computed value
+        """
+        value = await self.get(key)
+        if value is not None:
+            return value
+
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        self._lock_users[key] = self._lock_users.get(key, 0) + 1
+
+        try:
+            async with lock:
+                return await self._get_or_set_locked(key, compute, ttl)
+        finally:
+            self._lock_users[key] -= 1
+            if not self._lock_users[key]:
+                del self._lock_users[key]
+                del self._locks[key]
+
+    async def _get_or_set_locked(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Optional[Any]]],
+        ttl: float
+    ) -> Optional[Any]:
+        """Miss path of get_or_set, run while holding the key's local lock"""
+
+        # Another caller may have filled the key while we waited
+        value = await self.get(key)
+        if value is not None:
+            return value
+
+        if self._redis is None:
+            return await self._compute_and_set(key, compute, ttl)
+
+        # Serialise the recompute across processes too
+        redis_lock = self._redis.lock(
+            f"{key}:lock",
+            timeout=self.lock_timeout,
+            blocking_timeout=self.lock_timeout
+        )
+        try:
+            acquired = await redis_lock.acquire()
+        except Exception as e:
+            logger.warning(f"Redis lock failed for {key}: {str(e)}")
+            acquired = False
+
+        try:
+            value = await self.get(key)
+            if value is None:
+                value = await self._compute_and_set(key, compute, ttl)
+            return value
+        finally:
+            if acquired:
+                try:
+                    await redis_lock.release()
+                except Exception as e:
+                    logger.warning(f"Redis unlock failed for {key}: {str(e)}")
+
+    async def _compute_and_set(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Optional[Any]]],
+        ttl: float
+    ) -> Optional[Any]:
+        """Run compute() and store a non-None result"""
+
+        value = await compute()
+        if value is not None:
+            await self.set(key, value, ttl)
+        return value
+
+    async def close(self):
+        """Close the Redis connection, if any"""
+
+        if self._redis is not None:
+            await self._redis.aclose()
@@ -0,0 +1,55 @@
+"""
+Shared HTTP clients for OpenAI calls
+One keep-alive HTTP/2 connection pool per process instead of one per ChatOpenAI
+"""
+
+import asyncio
+import threading
+from typing import Dict
+
+import httpx
+
+_LIMITS = httpx.Limits(
+    max_keepalive_connections=50,
+    max_connections=100,
+    keepalive_expiry=300
+)
+_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+
+SHARED_HTTP_CLIENT = httpx.Client(http2=True, limits=_LIMITS, timeout=_TIMEOUT)
+
+
+class _PerLoopTransport(httpx.AsyncBaseTransport):
+    """
+    Async transport keeping one connection pool per event loop
+
+    Pooled connections belong to the loop that opened them, and the agents'
+    sync entry points start a new loop (asyncio.run) on every call, so a
+    single pool cannot be shared between those calls.
+    """
+
+    def __init__(self):
+        self._transports: Dict[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport] = {}
+        self._lock = threading.Lock()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        loop = asyncio.get_running_loop()
+        transport = self._transports.get(loop)
+        if transport is None:
+            with self._lock:
+                # Pools of finished loops can never be used again
+                for closed in [other for other in self._transports if other.is_closed()]:
+                    del self._transports[closed]
+                transport = self._transports.setdefault(
+                    loop, httpx.AsyncHTTPTransport(http2=True, limits=_LIMITS)
+                )
+        return await transport.handle_async_request(request)
+
+    async def aclose(self):
+        with self._lock:
+            transport = self._transports.pop(asyncio.get_running_loop(), None)
+        if transport is not None:
+            await transport.aclose()
+
+
+SHARED_ASYNC_HTTP_CLIENT = httpx.AsyncClient(transport=_PerLoopTransport(), timeout=_TIMEOUT)
@@ -0,0 +1,55 @@
+"""
+Shared chat model clients
+One ChatOpenAI per (model, temperature) for the whole process
+"""
+
+import functools
+
+import tiktoken
+from langchain_openai import ChatOpenAI
+from loguru import logger
+
+from tools._http import SHARED_ASYNC_HTTP_CLIENT, SHARED_HTTP_CLIENT
+
+
+@functools.lru_cache(maxsize=8)
+def get_encoding(model: str):
+    """
+    Load a model's tokenizer once, so the first request never waits on the BPE download
+
+    Set TIKTOKEN_CACHE_DIR to a directory shipped with the image to run offline.
+
+    Args:
+        model: OpenAI model name
+
+    Returns:
+        tiktoken Encoding, or None if it could not be loaded
+    """
+    try:
+        return tiktoken.encoding_for_model(model)
+    except Exception as e:
+        logger.warning(f"Could not preload tokenizer for {model}: {str(e)}")
+        return None
+
+
+@functools.lru_cache(maxsize=8)
+def get_chat(model: str, temperature: float) -> ChatOpenAI:
+    """
+    Return the process-wide chat client for a model and temperature
+
+    Args:
+        model: OpenAI model name
+        temperature: Sampling temperature
+
+    Returns:
+        Shared ChatOpenAI instance
+    """
+    # tiktoken keeps loaded encodings in its own registry, so langchain's
+    # later lookups for this model reuse the one loaded here
+    get_encoding(model)
+    return ChatOpenAI(
+        model=model,
+        temperature=temperature,
+        http_client=SHARED_HTTP_CLIENT,
+        http_async_client=SHARED_ASYNC_HTTP_CLIENT
+    )
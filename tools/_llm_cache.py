@@ -0,0 +1,239 @@
+"""
+Exact-match cache for LLM chain calls, backed by SQLite
+
+Only deterministic (temperature 0) chains are cached, so creative chains
+keep producing fresh output for repeated inputs.
+"""
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, List, Optional, Tuple, Union
+
+from loguru import logger
+
+# Caching is off unless LLM_CACHE_PATH names the database file
+
+_lock = threading.Lock()
+_connection: Optional[sqlite3.Connection] = None
+_connection_path: Optional[str] = None
+
+
+def _get_connection() -> Optional[sqlite3.Connection]:
+    """Open (once) the cache database named by LLM_CACHE_PATH"""
+    global _connection, _connection_path
+
+    path = os.getenv('LLM_CACHE_PATH', '')
+    if not path:
+        return None
+
+    if _connection is not None and _connection_path == path:
+        return _connection
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    connection = sqlite3.connect(path, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS cache ("
+        "key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL)"
+    )
+    connection.commit()
+
+    _connection, _connection_path = connection, path
+    logger.debug(f"LLM cache opened at {path}")
+    return connection
+
+
+def _chain_llm(chain):
+    """The chat model of a prompt | llm chain"""
+
+    # Unwrap llm.bind(...) / structured output so bound models share the base model's identity
+    llm = chain.steps[1]
+    return getattr(llm, 'bound', llm)
+
+
+def _deterministic(chain) -> bool:
+    """Whether the chain's model samples at temperature 0, so a stored answer stays valid"""
+    return getattr(_chain_llm(chain), 'temperature', None) == 0
+
+
+def _cache_key(chain, kwargs: dict) -> str:
+    """Hash the model, temperature and fully rendered prompt of a prompt | llm chain"""
+
+    prompt, llm = chain.first, _chain_llm(chain)
+
+    model = getattr(llm, 'model_name', None) or getattr(llm, 'model', '')
+    temperature = getattr(llm, 'temperature', '')
+    rendered = prompt.format(**kwargs)
+
+    return hashlib.sha256(f"{model}|{temperature}|{rendered}".encode()).hexdigest()
+
+
+def _lookup(key: str) -> Optional[str]:
+    """Return the stored response for a key, if caching is enabled and it exists"""
+
+    with _lock:
+        connection = _get_connection()
+        if connection is None:
+            return None
+        row = connection.execute("SELECT response FROM cache WHERE key = ?", (key,)).fetchone()
+
+    if row is not None:
+        logger.debug("LLM cache hit")
+        return row[0]
+    return None
+
+
+def _store(key: str, response: str):
+    """Store a response under a key, if caching is enabled"""
+
+    with _lock:
+        connection = _get_connection()
+        if connection is None:
+            return
+        connection.execute(
+            "INSERT OR REPLACE INTO cache (key, response, created_at) VALUES (?, ?, ?)",
+            (key, response, time.time())
+        )
+        connection.commit()
+
+
+def _store_many(items: List[Tuple[str, str]]):
+    """_store for several responses in one call (used from a worker thread)"""
+    for key, response in items:
+        _store(key, response)
+
+
+def _lookup_many(keys: List[str]) -> List[Optional[str]]:
+    """_lookup for several keys in one call (used from a worker thread)"""
+    return [_lookup(key) for key in keys]
+
+
+def _enabled() -> bool:
+    """Whether LLM_CACHE_PATH currently enables caching"""
+    with _lock:
+        return _get_connection() is not None
+
+
+def _use_cache(chain) -> bool:
+    """Whether calls to this chain should go through the cache"""
+    return _deterministic(chain) and _enabled()
+
+
+def cached_run(chain, **kwargs) -> str:
+    """
+    Invoke a prompt | llm | StrOutputParser chain, reusing the stored
+    response for an identical prompt when the chain is deterministic
+
+    Args:
+        chain: LCEL chain to invoke
+        **kwargs: Prompt variables
+
+    Returns:
+        Chain output text
+    """
+    return cached_call(chain, lambda: chain.invoke(kwargs), **kwargs)
+
+
+def cached_call(chain, compute: Callable[[], str], **kwargs) -> str:
+    """
+    Like cached_run, but produce the response with compute() on a miss
+
+    Lets callers keyed by a chain's model and prompt call the model some
+    other way, e.g. streaming with an early stop or structured output
+    serialised to JSON.
+
+    Args:
+        chain: LCEL chain whose prompt and model identify the request
+        compute: Produces the response text on a cache miss
+        **kwargs: Prompt variables
+
+    Returns:
+        Cached or freshly computed response text
+    """
+    if not _use_cache(chain):
+        return compute()
+
+    key = _cache_key(chain, kwargs)
+    cached = _lookup(key)
+    if cached is not None:
+        return cached
+
+    response = compute()
+    _store(key, response)
+    return response
+
+
+async def acached_run(chain, **kwargs) -> str:
+    """
+    Async variant of cached_run using chain.ainvoke
+
+    SQLite access runs in a worker thread so the event loop stays free.
+
+    Args:
+        chain: LCEL chain to invoke
+        **kwargs: Prompt variables
+
+    Returns:
+        Chain output text
+    """
+    if not _deterministic(chain) or not await asyncio.to_thread(_enabled):
+        return await chain.ainvoke(kwargs)
+
+    key = _cache_key(chain, kwargs)
+    cached = await asyncio.to_thread(_lookup, key)
+    if cached is not None:
+        return cached
+
+    response = await chain.ainvoke(kwargs)
+    await asyncio.to_thread(_store, key, response)
+    return response
+
+
+async def acached_batch(chain, inputs: List[dict], max_concurrency: int = 10) -> List[Union[str, Exception]]:
+    """
+    Run a chain over many inputs, calling the model only for cache misses
+
+    Misses go through one chain.abatch call, which overlaps the requests
+    up to max_concurrency. Failed inputs come back as their exception and
+    are not cached.
+
+    Args:
+        chain: LCEL chain to invoke
+        inputs: Prompt variables for each call
+        max_concurrency: Upper bound on in-flight model calls
+
+    Returns:
+        Output text (or exception) for each input, in input order
+    """
+    results: List[Optional[Union[str, Exception]]] = [None] * len(inputs)
+    keys = [None] * len(inputs)
+
+    if _deterministic(chain) and await asyncio.to_thread(_enabled):
+        keys = [_cache_key(chain, kwargs) for kwargs in inputs]
+        results = await asyncio.to_thread(_lookup_many, keys)
+
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        responses = await chain.abatch(
+            [inputs[i] for i in missing],
+            config={'max_concurrency': max_concurrency},
+            return_exceptions=True
+        )
+        to_store = []
+        for i, response in zip(missing, responses):
+            results[i] = response
+            if keys[i] is not None and not isinstance(response, Exception):
+                to_store.append((keys[i], response))
+
+        if to_store:
+            await asyncio.to_thread(_store_many, to_store)
+
+    return results
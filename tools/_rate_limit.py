@@ -0,0 +1,116 @@
+"""
+Per-host rate limiting driven by API response headers
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Dict, Optional
+
+from loguru import logger
+
+# X-RateLimit-Reset values above this are epoch seconds, below it a delay
+_EPOCH_THRESHOLD = 1_000_000_000
+
+
+class HostRateLimiter:
+    """
+    Caps concurrent requests per host and holds new requests back until the
+    time the host asked for (Retry-After, or an exhausted X-RateLimit budget)
+
+    Must be used from a single event loop.
+    """
+
+    def __init__(self, max_concurrent_per_host: int = 8):
+        """
+        Initialize rate limiter
+
+        Args:
+            max_concurrent_per_host: In-flight requests allowed per host
+        """
+        self.max_concurrent_per_host = max_concurrent_per_host
+
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._not_before: Dict[str, float] = {}
+
+    @asynccontextmanager
+    async def limit(self, host: str) -> AsyncIterator[None]:
+        """
+        Hold a request slot for a host, waiting out any requested pause
+
+        Args:
+            host: Request host name
+        """
+        semaphore = self._semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._semaphores[host] = asyncio.Semaphore(self.max_concurrent_per_host)
+
+        async with semaphore:
+            delay = self._not_before.get(host, 0.0) - time.monotonic()
+            if delay > 0:
+                logger.debug(f"Waiting {delay:.1f}s for {host} rate limit")
+                await asyncio.sleep(delay)
+            yield
+
+    def defer(self, host: str, seconds: float):
+        """
+        Hold back new requests to a host for at least this long
+
+        Args:
+            host: Request host name
+            seconds: Pause length
+        """
+        until = time.monotonic() + seconds
+        if until > self._not_before.get(host, 0.0):
+            self._not_before[host] = until
+
+    def update(self, host: str, headers) -> Optional[float]:
+        """
+        Learn the host's limits from a response
+
+        Args:
+            host: Request host name
+            headers: Response headers (case-insensitive mapping)
+
+        Returns:
+            Pause applied in seconds, or None if the host set no limit
+        """
+        delay = _retry_after(headers.get('retry-after'))
+
+        remaining = headers.get('x-ratelimit-remaining') or headers.get('x-rate-limit-remaining')
+        if delay is None and remaining is not None and remaining.strip() == '0':
+            delay = _reset_delay(headers.get('x-ratelimit-reset') or headers.get('x-rate-limit-reset'))
+
+        if delay is not None:
+            self.defer(host, delay)
+        return delay
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse Retry-After as seconds or an HTTP date"""
+
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _reset_delay(value: Optional[str]) -> Optional[float]:
+    """Parse X-RateLimit-Reset as epoch seconds or seconds from now"""
+
+    try:
+        reset = float(value)
+    except (TypeError, ValueError):
+        return None
+
+    if reset > _EPOCH_THRESHOLD:
+        return max(0.0, reset - time.time())
+    return reset
@@ -2,11 +2,73 @@
 Brand Voice Validator - Ensures content matches brand identity
 """
 
-from typing import Dict
+import asyncio
+import hashlib
+import re
+import threading
+from typing import Dict, List, Optional
+import cachetools
+import numpy as np
 from loguru import logger
-from langchain_openai import ChatOpenAI
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
+from langchain.prompts import ChatPromptTemplate
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import Runnable
+
+from tools._llm import get_chat
+from tools._llm_cache import acached_batch, cached_call, cached_run
+from tools.semantic_cache import SemanticCache
+
+
+# System prompts hold the instructions and brand profile, which are fixed
+# per validator, so they form a cacheable prefix; the content goes last
+_SCORE_SYSTEM = """Analyze if the content in the user message matches the brand voice.
+
+Brand Voice: {brand_voice}
+Tone: {tone}
+Values: {values}
+
+Rate how well the content matches the brand voice on a scale of 0-1:
+- 1.0: Perfect match
+- 0.7-0.9: Good match with minor adjustments needed
+- 0.5-0.7: Moderate match, needs revision
+- Below 0.5: Poor match, major revision needed
+
+Consider:
+- Tone and style consistency
+- Alignment with brand values
+- Language and vocabulary choice
+- Professionalism level
+- Authenticity
+
+Return only the numeric score (e.g., 0.85)"""
+
+# A score is complete once something other than a digit or '.' follows it
+_SCORE_RE = re.compile(r"(?<![\d.])(1(?:\.0+)?|0(?:\.\d+)?)(?!\d|\.\d)")
+
+_SUGGEST_SYSTEM = """Suggest improvements to make the content in the user message better match the brand voice.
+
+Brand Voice: {brand_voice}
+
+Provide specific, actionable suggestions to improve:
+1. Tone and style
+2. Word choice
+3. Structure
+4. Authenticity
+
+Keep suggestions concise and practical."""
+
+_REWRITE_SYSTEM = """Rewrite the content in the user message to perfectly match the brand voice.
+
+Brand Voice: {brand_voice}
+Tone: {tone}
+
+Requirements:
+- Keep the core message and information
+- Match the brand voice exactly
+- Maintain similar length
+- Keep it natural and authentic
+
+Return only the rewritten content."""
 
 
 class BrandVoiceValidator:
@@ -22,15 +84,79 @@ class BrandVoiceValidator:
             brand_config: Brand configuration dictionary
         """
         self.brand_config = brand_config
-        self.llm = ChatOpenAI(model="gpt-4", temperature=0.3)
+        self.llm = get_chat("gpt-4", 0.3)
+        
+        # Scoring only returns one number, so a small model at temperature 0
+        # is enough; suggestions and rewrites keep the larger model
+        settings = brand_config.get('settings', {})
+        self.scoring_model = settings.get('brand_voice_scoring_model', 'gpt-4o-mini')
+        self.scoring_llm = get_chat(self.scoring_model, 0)
+        
+        # Hard cap on the reply; the score itself is a handful of tokens
+        self.score_max_tokens = 8
         
         # Extract brand voice attributes
         self.brand_voice = brand_config.get('brand_voice', 'Professional')
         self.tone = brand_config.get('tone', [])
         self.values = brand_config.get('values', [])
         
+        # Optional score cache. By default it only reuses scores for
+        # identical drafts; match: semantic also reuses them for paraphrases,
+        # which a revision loop must not rely on (a rewrite keeps the meaning
+        # but should be re-scored). Keys hash the scoring model and voice
+        # attributes, so changing either invalidates every cached score.
+        cache_config = settings.get('brand_voice_cache', {})
+        ttl_seconds = cache_config.get('ttl_hours', 720) * 3600
+        self.score_cache = None
+        self._exact_scores: Optional[cachetools.TTLCache] = None
+        self._exact_lock = threading.Lock()
+        if cache_config.get('enabled', False):
+            if cache_config.get('match', 'exact') == 'semantic':
+                self.score_cache = SemanticCache(
+                    similarity_threshold=cache_config.get('similarity_threshold', 0.95),
+                    ttl_seconds=ttl_seconds,
+                    persist_path=cache_config.get('path', '.cache/brand_voice_scores.npz'),
+                    dtype=np.float16,
+                    embedding_backend=cache_config.get('embedding_backend', 'local')
+                )
+            else:
+                self._exact_scores = cachetools.TTLCache(
+                    maxsize=cache_config.get('max_entries', 10000),
+                    ttl=ttl_seconds
+                )
+        
+        # Prompts with the brand profile baked into the system message
+        tone = ', '.join(self.tone) if self.tone else 'neutral'
+        values = ', '.join(self.values) if self.values else 'none specified'
+        self._score_chain = self._build_chain(
+            _SCORE_SYSTEM, "Content: {content}",
+            llm=self.scoring_llm.bind(max_tokens=self.score_max_tokens),
+            brand_voice=self.brand_voice, tone=tone, values=values
+        )
+        self._suggest_chain = self._build_chain(
+            _SUGGEST_SYSTEM, "Original Content: {content}",
+            brand_voice=self.brand_voice
+        )
+        self._rewrite_chain = self._build_chain(
+            _REWRITE_SYSTEM, "Original: {content}",
+            brand_voice=self.brand_voice, tone=tone
+        )
+        
+        voice_key = '\x1f'.join([self.scoring_model, self.brand_voice, *sorted(self.tone), *sorted(self.values)])
+        self._score_namespace = f"score:{hashlib.sha256(voice_key.encode()).hexdigest()[:16]}"
+        
         logger.info("Brand Voice Validator initialized")
     
+    def _build_chain(self, system_template: str, human_template: str, llm=None, **brand_fields) -> Runnable:
+        """Build a prompt | llm | parser chain whose system message is fixed by the brand fields"""
+        
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", system_template),
+            ("human", human_template)
+        ]).partial(**brand_fields)
+        
+        return prompt | (llm or self.llm) | StrOutputParser()
+    
     def validate(self, content: str, threshold: float = 0.7) -> bool:
         """
         Validate if content matches brand voice
@@ -65,50 +191,162 @@ class BrandVoiceValidator:
         Returns:
             Score between 0 and 1
         """
-        prompt = PromptTemplate(
-            input_variables=["content", "brand_voice", "tone", "values"],
-            template="""Analyze if this content matches the brand voice.
-            
-            Brand Voice: {brand_voice}
-            Tone: {tone}
-            Values: {values}
-            
-            Content: {content}
+        try:
+            if self._exact_scores is not None:
+                key = self._exact_key(content)
+                score = self._cached_score(key)
+                if score is None:
+                    score = self._score_with_llm(content)
+                    self._store_score(key, score)
+                return score
             
-            Rate how well the content matches the brand voice on a scale of 0-1:
-            - 1.0: Perfect match
-            - 0.7-0.9: Good match with minor adjustments needed
-            - 0.5-0.7: Moderate match, needs revision
-            - Below 0.5: Poor match, major revision needed
+            if self.score_cache is None:
+                return self._score_with_llm(content)
             
-            Consider:
-            - Tone and style consistency
-            - Alignment with brand values
-            - Language and vocabulary choice
-            - Professionalism level
-            - Authenticity
+            return self.score_cache.get_or_compute(
+                content,
+                lambda: self._score_with_llm(content),
+                namespace=self._score_namespace
+            )
             
-            Return only the numeric score (e.g., 0.85)
-            """
+        except Exception as e:
+            logger.error(f"Error scoring content: {str(e)}")
+            return 0.5  # Default to moderate score on error
+    
+    def _exact_key(self, content: str) -> str:
+        """Exact-match cache key for a draft under this validator's voice"""
+        
+        return hashlib.blake2b(f"{self._score_namespace}|{content}".encode(), digest_size=16).hexdigest()
+    
+    def _cached_score(self, key: str) -> Optional[float]:
+        """Score stored for an identical draft, if any"""
+        
+        with self._exact_lock:
+            return self._exact_scores.get(key)
+    
+    def _store_score(self, key: str, score: float):
+        """Remember the score of a draft"""
+        
+        with self._exact_lock:
+            self._exact_scores[key] = score
+    
+    def _score_with_llm(self, content: str) -> float:
+        """Score content with the LLM; raises on failure so errors are never cached"""
+        
+        result = cached_call(
+            self._score_chain,
+            lambda: self._stream_score(content),
+            content=content
         )
         
-        chain = LLMChain(llm=self.llm, prompt=prompt)
+        return self._parse_score(result)
+    
+    @staticmethod
+    def _parse_score(result: str) -> float:
+        """Extract the numeric score from a reply; raises ValueError if there is none"""
+        
+        match = _SCORE_RE.search(result)
+        score = float(match.group(1)) if match else float(result.strip())
+        return min(max(score, 0.0), 1.0)  # Clamp between 0 and 1
+    
+    def _stream_score(self, content: str) -> str:
+        """Stream the score reply and stop reading as soon as a full number has arrived"""
+        
+        stream = self._score_chain.stream({'content': content})
         
+        text = ''
         try:
-            result = chain.run(
-                content=content,
-                brand_voice=self.brand_voice,
-                tone=', '.join(self.tone) if self.tone else 'neutral',
-                values=', '.join(self.values) if self.values else 'none specified'
+            for chunk in stream:
+                text += chunk
+                match = _SCORE_RE.search(text)
+                # Only stop on a terminated number, so "0.8" is not cut from "0.85"
+                if match and text[match.end():] not in ('', '.'):
+                    return match.group(1)
+        finally:
+            # Closing the generator closes the HTTP response
+            stream.close()
+        
+        return text.strip()
+    
+    async def ascore_content_batch(self, contents: List[str], max_concurrency: int = 10) -> List[float]:
+        """
+        Score many drafts at once
+        
+        Drafts already in the score cache (identical, or similar with
+        match: semantic) reuse their score; the rest go to the model in one
+        concurrent batch.
+        
+        Args:
+            contents: Contents to score
+            max_concurrency: Upper bound on in-flight LLM calls
+        
+        Returns:
+            Scores between 0 and 1, in input order
+        """
+        scores: List = [None] * len(contents)
+        embeddings = None
+        keys = None
+        
+        if self._exact_scores is not None:
+            keys = [self._exact_key(content) for content in contents]
+            scores = [self._cached_score(key) for key in keys]
+        
+        if self.score_cache is not None and contents:
+            try:
+                embeddings = await asyncio.to_thread(self.score_cache.embed_many, contents)
+                for i, embedding in enumerate(embeddings):
+                    scores[i] = self.score_cache.lookup(self._score_namespace, embedding)
+            except Exception as e:
+                logger.warning(f"Semantic cache embedding failed: {str(e)}")
+                embeddings = None
+        
+        missing = [i for i, score in enumerate(scores) if score is None]
+        if missing:
+            replies = await acached_batch(
+                self._score_chain,
+                [{'content': contents[i]} for i in missing],
+                max_concurrency=max_concurrency
             )
-            
-            # Extract numeric score
-            score = float(result.strip())
-            return min(max(score, 0.0), 1.0)  # Clamp between 0 and 1
-            
-        except Exception as e:
-            logger.error(f"Error scoring content: {str(e)}")
-            return 0.5  # Default to moderate score on error
+            for i, reply in zip(missing, replies):
+                try:
+                    if isinstance(reply, Exception):
+                        raise reply
+                    scores[i] = self._parse_score(reply)
+                except Exception as e:
+                    logger.error(f"Error scoring content: {str(e)}")
+                    scores[i] = 0.5  # Default to moderate score on error
+                    continue
+                
+                if keys is not None:
+                    self._store_score(keys[i], scores[i])
+                if embeddings is not None:
+                    self.score_cache.add(self._score_namespace, embeddings[i], scores[i])
+        
+        return scores
+    
+    async def avalidate_batch(
+        self,
+        contents: List[str],
+        threshold: float = 0.7,
+        max_concurrency: int = 10
+    ) -> List[bool]:
+        """
+        Validate many drafts at once
+        
+        Args:
+            contents: Contents to validate
+            threshold: Minimum score to pass (0-1)
+            max_concurrency: Upper bound on in-flight LLM calls
+        
+        Returns:
+            True for each content that passes validation, in input order
+        """
+        scores = await self.ascore_content_batch(contents, max_concurrency=max_concurrency)
+        
+        passed = [score >= threshold for score in scores]
+        logger.info(f"{sum(passed)}/{len(passed)} posts passed brand voice validation")
+        
+        return passed
     
     def suggest_improvements(self, content: str) -> str:
         """
@@ -120,25 +358,7 @@ class BrandVoiceValidator:
         Returns:
             Suggested improvements
         """
-        prompt = PromptTemplate(
-            input_variables=["content", "brand_voice"],
-            template="""Suggest improvements to make this content better match the brand voice.
-            
-            Brand Voice: {brand_voice}
-            Original Content: {content}
-            
-            Provide specific, actionable suggestions to improve:
-            1. Tone and style
-            2. Word choice
-            3. Structure
-            4. Authenticity
-            
-            Keep suggestions concise and practical.
-            """
-        )
-        
-        chain = LLMChain(llm=self.llm, prompt=prompt)
-        suggestions = chain.run(content=content, brand_voice=self.brand_voice)
+        suggestions = cached_run(self._suggest_chain, content=content)
         
         return suggestions.strip()
     
@@ -154,29 +374,7 @@ class BrandVoiceValidator:
         """
         logger.info("Rewriting content to match brand voice")
         
-        prompt = PromptTemplate(
-            input_variables=["content", "brand_voice", "tone"],
-            template="""Rewrite this content to perfectly match the brand voice.
-            
-            Brand Voice: {brand_voice}
-            Tone: {tone}
-            Original: {content}
-            
-            Requirements:
-            - Keep the core message and information
-            - Match the brand voice exactly
-            - Maintain similar length
-            - Keep it natural and authentic
-            
-            Rewritten content:"""
-        )
-        
-        chain = LLMChain(llm=self.llm, prompt=prompt)
-        rewritten = chain.run(
-            content=content,
-            brand_voice=self.brand_voice,
-            tone=', '.join(self.tone) if self.tone else 'neutral'
-        )
+        rewritten = cached_run(self._rewrite_chain, content=content)
         
         return rewritten.strip()
 
@@ -2,11 +2,131 @@
 Hashtag Generator - Creates relevant hashtags for social media posts
 """
 
-from typing import List
+import functools
+import re
+from types import MappingProxyType
+from typing import List, Mapping
 from loguru import logger
-from langchain_openai import ChatOpenAI
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
+from langchain.prompts import ChatPromptTemplate, PromptTemplate
+from langchain_core.output_parsers import StrOutputParser
+from pydantic import BaseModel, Field
+
+from tools._llm import get_chat
+from tools._llm_cache import cached_call, cached_run
+
+
+# One scan pulls every tag whether the model separates them with commas,
+# spaces or newlines, with or without the leading #
+_TAG_RE = re.compile(r"#(\w{2,64})(?!\w)")
+# Separators for replies that list bare tags without any "#"
+_BARE_TAG_SPLIT_RE = re.compile(r"[\s,]+")
+_BARE_TAG_RE = re.compile(r"\w{2,64}")
+
+# Platform-specific recommendations
+_PLATFORM_SPECS = MappingProxyType({
+    'instagram': MappingProxyType({
+        'max_hashtags': 30,
+        'optimal_count': 10,
+        'style': 'mix of popular and niche'
+    }),
+    'linkedin': MappingProxyType({
+        'max_hashtags': 5,
+        'optimal_count': 5,
+        'style': 'professional and industry-specific'
+    }),
+    'twitter': MappingProxyType({
+        'max_hashtags': 2,
+        'optimal_count': 2,
+        'style': 'trending and concise'
+    }),
+    'facebook': MappingProxyType({
+        'max_hashtags': 3,
+        'optimal_count': 3,
+        'style': 'broad and discoverable'
+    })
+})
+
+
+@functools.lru_cache(maxsize=16)
+def _specs_for(platform: str) -> Mapping:
+    """Specs for a platform name in any case, falling back to Instagram's"""
+    return _PLATFORM_SPECS.get(platform.lower(), _PLATFORM_SPECS['instagram'])
+
+
+# Fixed per platform, so each platform's system message is a cacheable prefix
+_GENERATE_SYSTEM = """Generate relevant hashtags for the social media post in the user message.
+
+Platform: {platform}
+Style: {style}
+
+Requirements:
+- Mix of popular (100k+ posts) and niche (1k-50k posts) hashtags
+- Relevant to the content topic
+- Industry-appropriate
+- No spaces or special characters
+- Start with #
+
+Return the hashtags as a list, e.g. ["#Marketing", "#SocialMedia", "#Growth"]"""
+
+_GENERATE_MANY_SYSTEM = """Generate relevant hashtags for each numbered social media post in the user message.
+
+Platform: {platform}
+Style: {style}
+
+Requirements:
+- Mix of popular (100k+ posts) and niche (1k-50k posts) hashtags
+- Relevant to each post's topic
+- Industry-appropriate
+- No spaces or special characters
+- Start with #
+
+Return one list of hashtags per post, in the same order as the posts."""
+
+_ANALYZE_TEMPLATE = PromptTemplate(
+    input_variables=["hashtag", "platform"],
+    template="""Analyze this hashtag for {platform}:
+
+Hashtag: #{hashtag}
+
+Provide analysis in this format:
+- Competition: low/medium/high
+- Estimated posts: number
+- Target audience: description
+- Recommendation: use/don't use
+
+Keep response concise."""
+)
+
+_CAMPAIGN_TEMPLATE = PromptTemplate(
+    input_variables=["campaign", "goal", "brand"],
+    template="""Create branded hashtags for this marketing campaign:
+
+Campaign: {campaign}
+Goal: {goal}
+Brand: {brand}
+
+Generate 5 hashtags:
+1. Primary branded hashtag (campaign-specific)
+2. Secondary branded hashtag (brand-specific)
+3. Category hashtag (industry/niche)
+4. Trending hashtag (aligned with current trends)
+5. Call-to-action hashtag (engagement)
+
+Make them memorable, easy to spell, and not too long.
+Return as comma-separated list."""
+)
+
+
+class HashtagList(BaseModel):
+    """Structured reply for generate"""
+    
+    tags: List[str] = Field(description="Hashtags for the post, each starting with #")
+
+
+class HashtagBatch(BaseModel):
+    """Structured reply for generate_many"""
+    
+    hashtags: List[List[str]] = Field(description="One list of hashtags per post, in input order")
 
 
 class HashtagGenerator:
@@ -14,9 +134,33 @@ class HashtagGenerator:
     Generates relevant and trending hashtags for posts
     """
     
+    # Posts per generate_many request, to keep prompt and reply well inside the context
+    batch_size = 20
+    
     def __init__(self):
         """Initialize hashtag generator"""
-        self.llm = ChatOpenAI(model="gpt-4", temperature=0.5)
+        self.llm = get_chat("gpt-4", 0.5)
+        
+        # One structured-output chain per platform with the platform and style baked in
+        self._generate_prompt = ChatPromptTemplate.from_messages([
+            ("system", _GENERATE_SYSTEM),
+            ("human", "Content: {content}\nNumber needed: {count}")
+        ])
+        self._tags_llm = self.llm.with_structured_output(HashtagList)
+        self._generate_chains = {
+            platform: self._generate_prompt.partial(platform=platform, style=specs['style']) | self._tags_llm
+            for platform, specs in _PLATFORM_SPECS.items()
+        }
+        
+        self._generate_many_prompt = ChatPromptTemplate.from_messages([
+            ("system", _GENERATE_MANY_SYSTEM),
+            ("human", "Number needed per post: {count}\n\n{posts}")
+        ])
+        self._batch_llm = self.llm.with_structured_output(HashtagBatch)
+        
+        self._analyze_chain = _ANALYZE_TEMPLATE | self.llm | StrOutputParser()
+        self._campaign_chain = _CAMPAIGN_TEMPLATE | self.llm | StrOutputParser()
+        
         logger.info("Hashtag Generator initialized")
     
     def generate(
@@ -40,70 +184,25 @@ class HashtagGenerator:
         """
         logger.info(f"Generating {count} hashtags for {platform}")
         
-        # Platform-specific recommendations
-        platform_specs = {
-            'instagram': {
-                'max_hashtags': 30,
-                'optimal_count': 10,
-                'style': 'mix of popular and niche'
-            },
-            'linkedin': {
-                'max_hashtags': 5,
-                'optimal_count': 5,
-                'style': 'professional and industry-specific'
-            },
-            'twitter': {
-                'max_hashtags': 2,
-                'optimal_count': 2,
-                'style': 'trending and concise'
-            },
-            'facebook': {
-                'max_hashtags': 3,
-                'optimal_count': 3,
-                'style': 'broad and discoverable'
-            }
-        }
-        
-        specs = platform_specs.get(platform.lower(), platform_specs['instagram'])
-        
-        prompt = PromptTemplate(
-            input_variables=["content", "platform", "count", "style"],
-            template="""Generate relevant hashtags for this social media post.
-            
-            Platform: {platform}
-            Content: {content}
-            Number needed: {count}
-            Style: {style}
-            
-            Requirements:
-            - Mix of popular (100k+ posts) and niche (1k-50k posts) hashtags
-            - Relevant to the content topic
-            - Industry-appropriate
-            - No spaces or special characters
-            - Start with #
-            
-            Return ONLY a comma-separated list of hashtags (e.g., #Marketing, #SocialMedia, #Growth)
-            """
-        )
-        
-        chain = LLMChain(llm=self.llm, prompt=prompt)
+        chain = self._generate_chains.get(platform.lower())
+        if chain is None:
+            # Unknown platform: use Instagram's style under the given name,
+            # and keep the chain for the next call
+            chain = self._generate_chains[platform.lower()] = self._generate_prompt.partial(
+                platform=platform, style=_specs_for(platform)['style']
+            ) | self._tags_llm
         
         try:
-            result = chain.run(
+            # Structured replies are cached as their JSON (deterministic chains only)
+            result = cached_call(
+                chain,
+                lambda: chain.invoke({'content': content, 'count': count}).model_dump_json(),
                 content=content,
-                platform=platform,
-                count=count,
-                style=specs['style']
+                count=count
             )
             
-            # Parse hashtags
-            hashtags = [
-                tag.strip() if tag.startswith('#') else f"#{tag.strip()}"
-                for tag in result.split(',')
-            ]
-            
-            # Remove duplicates and limit count
-            hashtags = list(dict.fromkeys(hashtags))[:count]
+            tags = HashtagList.model_validate_json(result).tags
+            hashtags = self._parse_hashtags(self._tag_text(tags), count)
             
             logger.success(f"Generated {len(hashtags)} hashtags")
             return hashtags
@@ -112,6 +211,66 @@ class HashtagGenerator:
             logger.error(f"Error generating hashtags: {str(e)}")
             return [f"#{platform}"]  # Fallback
     
+    def generate_many(
+        self,
+        contents: List[str],
+        platform: str = 'instagram',
+        count: int = 10
+    ) -> List[List[str]]:
+        """
+        Generate hashtags for several posts with one LLM call per batch
+        
+        Posts are sent in chunks of batch_size. A chunk whose reply fails or
+        has the wrong number of lists falls back to generate() per post.
+        
+        Args:
+            contents: Post contents
+            platform: Social media platform
+            count: Number of hashtags per post
+        
+        Returns:
+            List of hashtag lists, one per post in input order
+        """
+        logger.info(f"Generating hashtags for {len(contents)} {platform} posts")
+        
+        specs = _specs_for(platform)
+        chain = self._generate_many_prompt.partial(platform=platform, style=specs['style']) | self._batch_llm
+        
+        results = []
+        for start in range(0, len(contents), self.batch_size):
+            chunk = contents[start:start + self.batch_size]
+            posts = "\n\n".join(f"Post {i + 1}:\n{content}" for i, content in enumerate(chunk))
+            
+            try:
+                reply = chain.invoke({'posts': posts, 'count': count})
+                if len(reply.hashtags) != len(chunk):
+                    raise ValueError(f"expected {len(chunk)} hashtag lists, got {len(reply.hashtags)}")
+                results.extend(self._parse_hashtags(self._tag_text(tags), count) for tags in reply.hashtags)
+            except Exception as e:
+                logger.warning(f"Batched hashtag generation failed, generating per post: {str(e)}")
+                results.extend(self.generate(content, platform=platform, count=count) for content in chunk)
+        
+        logger.success(f"Generated hashtags for {len(results)} posts")
+        return results
+    
+    @staticmethod
+    def _parse_hashtags(text: str, count: int) -> List[str]:
+        """Extract #-prefixed tags from model output, deduplicated and limited to count"""
+        
+        if '#' in text:
+            tags = (m.group(1) for m in _TAG_RE.finditer(text))
+        else:
+            # No "#" at all: the model listed bare tags, comma or space separated
+            tags = (tag for tag in _BARE_TAG_SPLIT_RE.split(text) if _BARE_TAG_RE.fullmatch(tag))
+        
+        return list(dict.fromkeys(f"#{tag}" for tag in tags))[:count]
+    
+    @staticmethod
+    def _tag_text(tags: List[str]) -> str:
+        """Join structured tags, adding any missing "#", for _parse_hashtags"""
+        
+        return ' '.join(f"#{tag.strip().lstrip('#')}" for tag in tags)
+    
     def analyze_hashtag_performance(
         self,
         hashtag: str,
@@ -130,24 +289,7 @@ class HashtagGenerator:
         # Remove # if present
         tag = hashtag.lstrip('#')
         
-        prompt = PromptTemplate(
-            input_variables=["hashtag", "platform"],
-            template="""Analyze this hashtag for {platform}:
-            
-            Hashtag: #{hashtag}
-            
-            Provide analysis in this format:
-            - Competition: low/medium/high
-            - Estimated posts: number
-            - Target audience: description
-            - Recommendation: use/don't use
-            
-            Keep response concise.
-            """
-        )
-        
-        chain = LLMChain(llm=self.llm, prompt=prompt)
-        analysis = chain.run(hashtag=tag, platform=platform)
+        analysis = cached_run(self._analyze_chain, hashtag=tag, platform=platform)
         
         return {
             'hashtag': f"#{tag}",
@@ -174,35 +316,9 @@ class HashtagGenerator:
         """
         logger.info(f"Generating campaign hashtags for: {campaign_name}")
         
-        prompt = PromptTemplate(
-            input_variables=["campaign", "goal", "brand"],
-            template="""Create branded hashtags for this marketing campaign:
-            
-            Campaign: {campaign}
-            Goal: {goal}
-            Brand: {brand}
-            
-            Generate 5 hashtags:
-            1. Primary branded hashtag (campaign-specific)
-            2. Secondary branded hashtag (brand-specific)
-            3. Category hashtag (industry/niche)
-            4. Trending hashtag (aligned with current trends)
-            5. Call-to-action hashtag (engagement)
-            
-            Make them memorable, easy to spell, and not too long.
-            Return as comma-separated list.
-            """
-        )
-        
-        chain = LLMChain(llm=self.llm, prompt=prompt)
-        result = chain.run(campaign=campaign_name, goal=campaign_goal, brand=brand_name)
-        
-        hashtags = [
-            tag.strip() if tag.startswith('#') else f"#{tag.strip()}"
-            for tag in result.split(',')
-        ]
+        result = cached_run(self._campaign_chain, campaign=campaign_name, goal=campaign_goal, brand=brand_name)
         
-        return hashtags[:5]
+        return self._parse_hashtags(result, 5)
 
 
 if __name__ == "__main__":
@@ -2,11 +2,135 @@
 Image Prompt Generator - Creates detailed prompts for visual content
 """
 
-from typing import Dict
+import functools
+from types import MappingProxyType
+from typing import Dict, List, Mapping
 from loguru import logger
-from langchain_openai import ChatOpenAI
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
+from langchain.prompts import ChatPromptTemplate, PromptTemplate
+from langchain_core.output_parsers import StrOutputParser
+from pydantic import BaseModel, Field
+
+from tools._llm import get_chat
+from tools._llm_cache import cached_call, cached_run
+
+
+# Platform specifications
+_PLATFORM_SPECS = MappingProxyType({
+    'instagram': MappingProxyType({
+        'aspect_ratio': '1:1 or 4:5',
+        'optimal_size': '1080x1080 or 1080x1350',
+        'style': 'eye-catching, mobile-optimized'
+    }),
+    'linkedin': MappingProxyType({
+        'aspect_ratio': '1.91:1',
+        'optimal_size': '1200x627',
+        'style': 'professional, clean'
+    }),
+    'twitter': MappingProxyType({
+        'aspect_ratio': '16:9',
+        'optimal_size': '1200x675',
+        'style': 'simple, clear message'
+    }),
+    'facebook': MappingProxyType({
+        'aspect_ratio': '1.91:1',
+        'optimal_size': '1200x630',
+        'style': 'engaging, shareable'
+    })
+})
+
+
+@functools.lru_cache(maxsize=16)
+def _specs_for(platform: str) -> Mapping:
+    """Specs for a platform name in any case, falling back to Instagram's"""
+    return _PLATFORM_SPECS.get(platform.lower(), _PLATFORM_SPECS['instagram'])
+
+
+# Fixed per platform, so each platform's system message is a cacheable prefix
+_CREATE_SYSTEM = """Create a detailed image prompt for the social media post in the user message.
+
+Platform: {platform}
+Aspect Ratio: {aspect_ratio}
+
+Generate a detailed prompt that describes:
+1. Main subject/focus
+2. Composition and layout
+3. Color scheme
+4. Typography (if text overlay needed)
+5. Mood and atmosphere
+6. Background elements
+7. Any specific visual elements that support the message
+
+Make the prompt specific enough for a designer or AI image generator to execute.
+Keep it concise but comprehensive."""
+
+_CREATE_MANY_SYSTEM = """Create a detailed image prompt for each numbered social media post in the user message.
+
+Platform: {platform}
+Aspect Ratio: {aspect_ratio}
+
+Each prompt should describe:
+1. Main subject/focus
+2. Composition and layout
+3. Color scheme
+4. Typography (if text overlay needed)
+5. Mood and atmosphere
+6. Background elements
+7. Any specific visual elements that support the message
+
+Make each prompt specific enough for a designer or AI image generator to execute.
+Keep them concise but comprehensive.
+
+Return one prompt per post, in the same order as the posts."""
+
+_CAROUSEL_TEMPLATE = PromptTemplate(
+    input_variables=["slides", "platform", "theme", "slide_count"],
+    template="""Create image prompts for a {slide_count}-slide carousel post.
+
+Platform: {platform}
+Theme: {theme}
+
+Slide Contents:
+{slides}
+
+For each slide, create a prompt that:
+- Maintains visual consistency across all slides
+- Uses the same color scheme and style
+- Has clear visual hierarchy
+- Makes the sequence flow naturally
+
+Return as numbered list of prompts."""
+)
+
+_VISUAL_ELEMENTS_TEMPLATE = PromptTemplate(
+    input_variables=["content", "industry"],
+    template="""Based on this content, suggest visual elements:
+
+Content: {content}
+Industry: {industry}
+
+Suggest:
+1. Icons/Graphics: 3-5 relevant icons
+2. Background: background style
+3. Typography: font style recommendations
+4. Color Mood: suggested color palette
+5. Stock Photo Keywords: 5 keywords for finding relevant images"""
+)
+
+
+class VisualSuggestions(BaseModel):
+    """Structured reply for suggest_visual_elements"""
+    
+    icons: List[str] = Field(description="3-5 relevant icons or graphics")
+    background: str = Field(description="Background style")
+    typography: str = Field(description="Font style recommendations")
+    color_mood: str = Field(description="Suggested color palette")
+    stock_keywords: List[str] = Field(description="5 keywords for finding relevant stock photos")
+
+
+class ImagePromptBatch(BaseModel):
+    """Structured reply for create_prompt_many"""
+    
+    prompts: List[str] = Field(description="One image prompt per post, in input order")
 
 
 class ImagePromptGenerator:
@@ -14,11 +138,40 @@ class ImagePromptGenerator:
     Generates detailed image prompts for designers or AI image generators
     """
     
+    # Posts per create_prompt_many request, to keep prompt and reply well inside the context
+    batch_size = 20
+    
     def __init__(self):
         """Initialize image prompt generator"""
-        self.llm = ChatOpenAI(model="gpt-4", temperature=0.7)
+        self.llm = get_chat("gpt-4", 0.7)
+        
+        # One chain per platform with the platform and aspect ratio baked in
+        self._create_prompt = ChatPromptTemplate.from_messages([
+            ("system", _CREATE_SYSTEM),
+            ("human", "Post Content: {content}\nVisual Style: {style}\nBrand Colors: {colors}")
+        ])
+        self._create_chains = {
+            platform: self._build_create_chain(platform, specs['aspect_ratio'])
+            for platform, specs in _PLATFORM_SPECS.items()
+        }
+        
+        self._create_many_prompt = ChatPromptTemplate.from_messages([
+            ("system", _CREATE_MANY_SYSTEM),
+            ("human", "Visual Style: {style}\nBrand Colors: {colors}\n\n{posts}")
+        ])
+        self._batch_llm = self.llm.with_structured_output(ImagePromptBatch)
+        
+        self._carousel_chain = _CAROUSEL_TEMPLATE | self.llm | StrOutputParser()
+        self._visual_elements_chain = _VISUAL_ELEMENTS_TEMPLATE | self.llm.with_structured_output(VisualSuggestions)
+        
         logger.info("Image Prompt Generator initialized")
     
+    def _build_create_chain(self, platform: str, aspect_ratio: str):
+        """Build the create_prompt chain for one platform"""
+        
+        prompt = self._create_prompt.partial(platform=platform, aspect_ratio=aspect_ratio)
+        return prompt | self.llm | StrOutputParser()
+    
     def create_prompt(
         self,
         content: str,
@@ -40,63 +193,20 @@ class ImagePromptGenerator:
         """
         logger.info(f"Creating image prompt for {platform}")
         
-        # Platform specifications
-        platform_specs = {
-            'instagram': {
-                'aspect_ratio': '1:1 or 4:5',
-                'optimal_size': '1080x1080 or 1080x1350',
-                'style': 'eye-catching, mobile-optimized'
-            },
-            'linkedin': {
-                'aspect_ratio': '1.91:1',
-                'optimal_size': '1200x627',
-                'style': 'professional, clean'
-            },
-            'twitter': {
-                'aspect_ratio': '16:9',
-                'optimal_size': '1200x675',
-                'style': 'simple, clear message'
-            },
-            'facebook': {
-                'aspect_ratio': '1.91:1',
-                'optimal_size': '1200x630',
-                'style': 'engaging, shareable'
-            }
-        }
+        specs = _specs_for(platform)
         
-        specs = platform_specs.get(platform.lower(), platform_specs['instagram'])
-        
-        prompt_template = PromptTemplate(
-            input_variables=["content", "platform", "aspect_ratio", "style", "colors"],
-            template="""Create a detailed image prompt for a social media post.
-            
-            Post Content: {content}
-            Platform: {platform}
-            Aspect Ratio: {aspect_ratio}
-            Visual Style: {style}
-            Brand Colors: {colors}
-            
-            Generate a detailed prompt that describes:
-            1. Main subject/focus
-            2. Composition and layout
-            3. Color scheme
-            4. Typography (if text overlay needed)
-            5. Mood and atmosphere
-            6. Background elements
-            7. Any specific visual elements that support the message
-            
-            Make the prompt specific enough for a designer or AI image generator to execute.
-            Keep it concise but comprehensive.
-            """
-        )
-        
-        chain = LLMChain(llm=self.llm, prompt=prompt_template)
+        chain = self._create_chains.get(platform.lower())
+        if chain is None:
+            # Unknown platform: use Instagram's specs under the given name,
+            # and keep the chain for the next call
+            chain = self._create_chains[platform.lower()] = self._build_create_chain(
+                platform, specs['aspect_ratio']
+            )
         
         try:
-            image_prompt = chain.run(
+            image_prompt = cached_run(
+                chain,
                 content=content,
-                platform=platform,
-                aspect_ratio=specs['aspect_ratio'],
                 style=f"{style}, {specs['style']}",
                 colors=brand_colors or "modern, professional palette"
             )
@@ -108,6 +218,59 @@ class ImagePromptGenerator:
             logger.error(f"Error creating image prompt: {str(e)}")
             return f"Create a {style} image for {platform} about: {content}"
     
+    def create_prompt_many(
+        self,
+        contents: List[str],
+        platform: str = 'instagram',
+        style: str = 'professional',
+        brand_colors: str = None
+    ) -> List[str]:
+        """
+        Generate image prompts for several posts with one LLM call per batch
+        
+        Posts are sent in chunks of batch_size. A chunk whose reply fails or
+        has the wrong number of prompts falls back to create_prompt() per post.
+        
+        Args:
+            contents: Post contents/captions
+            platform: Social media platform
+            style: Visual style (professional, minimal, vibrant, etc.)
+            brand_colors: Brand color palette
+        
+        Returns:
+            List of image prompts, one per post in input order
+        """
+        logger.info(f"Creating image prompts for {len(contents)} {platform} posts")
+        
+        specs = _specs_for(platform)
+        chain = self._create_many_prompt.partial(
+            platform=platform, aspect_ratio=specs['aspect_ratio']
+        ) | self._batch_llm
+        
+        prompts = []
+        for start in range(0, len(contents), self.batch_size):
+            chunk = contents[start:start + self.batch_size]
+            posts = "\n\n".join(f"Post {i + 1}:\n{content}" for i, content in enumerate(chunk))
+            
+            try:
+                reply = chain.invoke({
+                    'posts': posts,
+                    'style': f"{style}, {specs['style']}",
+                    'colors': brand_colors or "modern, professional palette"
+                })
+                if len(reply.prompts) != len(chunk):
+                    raise ValueError(f"expected {len(chunk)} prompts, got {len(reply.prompts)}")
+                prompts.extend(prompt.strip() for prompt in reply.prompts)
+            except Exception as e:
+                logger.warning(f"Batched image prompt generation failed, creating per post: {str(e)}")
+                prompts.extend(
+                    self.create_prompt(content, platform=platform, style=style, brand_colors=brand_colors)
+                    for content in chunk
+                )
+        
+        logger.success(f"Created {len(prompts)} image prompts")
+        return prompts
+    
     def create_carousel_prompts(
         self,
         content_slides: list,
@@ -127,30 +290,10 @@ class ImagePromptGenerator:
         """
         logger.info(f"Creating carousel prompts for {len(content_slides)} slides")
         
-        prompt_template = PromptTemplate(
-            input_variables=["slides", "platform", "theme", "slide_count"],
-            template="""Create image prompts for a {slide_count}-slide carousel post.
-            
-            Platform: {platform}
-            Theme: {theme}
-            
-            Slide Contents:
-            {slides}
-            
-            For each slide, create a prompt that:
-            - Maintains visual consistency across all slides
-            - Uses the same color scheme and style
-            - Has clear visual hierarchy
-            - Makes the sequence flow naturally
-            
-            Return as numbered list of prompts.
-            """
-        )
-        
         slides_text = "\n".join([f"{i+1}. {slide}" for i, slide in enumerate(content_slides)])
         
-        chain = LLMChain(llm=self.llm, prompt=prompt_template)
-        result = chain.run(
+        result = cached_run(
+            self._carousel_chain,
             slides=slides_text,
             platform=platform,
             theme=theme,
@@ -177,35 +320,21 @@ class ImagePromptGenerator:
         Returns:
             Dictionary of visual element suggestions
         """
-        prompt_template = PromptTemplate(
-            input_variables=["content", "industry"],
-            template="""Based on this content, suggest visual elements:
-            
-            Content: {content}
-            Industry: {industry}
-            
-            Suggest:
-            1. Icons/Graphics: 3-5 relevant icons
-            2. Background: background style
-            3. Typography: font style recommendations
-            4. Color Mood: suggested color palette
-            5. Stock Photo Keywords: 5 keywords for finding relevant images
-            
-            Format as JSON.
-            """
-        )
-        
-        chain = LLMChain(llm=self.llm, prompt=prompt_template)
-        result = chain.run(
-            content=content,
-            industry=industry or "general"
-        )
+        industry = industry or "general"
         
         try:
-            import json
-            suggestions = json.loads(result)
-            return suggestions
-        except:
+            # Structured replies are cached as their JSON (deterministic chains only)
+            result = cached_call(
+                self._visual_elements_chain,
+                lambda: self._visual_elements_chain.invoke(
+                    {'content': content, 'industry': industry}
+                ).model_dump_json(),
+                content=content,
+                industry=industry
+            )
+            return VisualSuggestions.model_validate_json(result).model_dump()
+        except Exception as e:
+            logger.error(f"Error suggesting visual elements: {str(e)}")
             return {
                 'icons': [],
                 'background': 'clean, minimal',
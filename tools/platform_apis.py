@@ -2,18 +2,118 @@
 Platform API Wrappers for social media posting and data retrieval
 """
 
+import asyncio
+import hashlib
 import os
-import requests
+import re
+import threading
+from concurrent.futures import Future
 from datetime import datetime
-from typing import Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Awaitable, Dict, List, Optional, Tuple, TypeVar
+
+import aiohttp
+import cachetools
+import httpx
+import orjson
 from loguru import logger
+from tenacity import (
+    AsyncRetrying,
+    RetryCallState,
+    retry_if_exception_type,
+    retry_if_result,
+    stop_after_attempt,
+    wait_random_exponential
+)
+from tweepy.asynchronous import AsyncClient
+
+from tools._cache_store import CacheStore
+from tools._rate_limit import HostRateLimiter
+
+T = TypeVar('T')
+
+# Order of the comma-separated profile IDs in BUFFER_PROFILE_IDS
+_BUFFER_PLATFORMS = ('instagram', 'linkedin', 'twitter', 'facebook')
+
+# Responses worth retrying: rate limited or a transient server failure
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Failures where the request never reached the server, so even a
+# non-idempotent POST can be retried without posting twice
+_UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+# The usual Graph API answer to a create call: a lone {"id": "..."}
+_ID_ONLY_RE = re.compile(rb'\s*\{\s*"id"\s*:\s*"([^"\\]+)"\s*\}\s*')
+
+# API endpoints
+_GRAPH_API = "https://graph.facebook.com/v18.0"
+_BUFFER_CREATE_URL = "https://api.bufferapp.com/1/updates/create.json"
+_BUFFER_PROFILES_URL = "https://api.bufferapp.com/1/profiles.json"
+_LINKEDIN_POSTS_URL = "https://api.linkedin.com/v2/ugcPosts"
+
+
+def _response_id(response: httpx.Response) -> Optional[str]:
+    """Read the id of a created object, skipping the JSON parse for {"id": ...} bodies"""
+    match = _ID_ONLY_RE.fullmatch(response.content)
+    if match:
+        return match.group(1).decode()
+    return orjson.loads(response.content).get('id')
+
+
+@lru_cache(maxsize=1024)
+def _to_epoch(scheduled_time: datetime) -> int:
+    """Unix timestamp of a schedule slot; batches reuse a handful of slots"""
+    return int(scheduled_time.timestamp())
 
 
 class PlatformManager:
     """
     Manages API connections to social media platforms
+    
+    All HTTP calls go through one httpx.AsyncClient running on the manager's
+    own event loop thread, so any number of callers (threads or other event
+    loops) share its connection pool and overlap their network waits.
+    Create one manager per process and reuse it, or use it as a context
+    manager so the pool is closed on exit.
     """
     
+    # Connection attempts retried by the transport before a request fails
+    connect_retries = 3
+    
+    # Connection pool size; over HTTP/2 each connection multiplexes many
+    # requests, so Instagram and Facebook calls to graph.facebook.com share
+    # one TLS connection rather than queueing behind each other
+    max_connections = 64
+    max_keepalive_connections = 32
+    keepalive_expiry = 60
+    
+    # Instagram posts in flight at once (each is a create + publish pair)
+    max_concurrent_instagram = 8
+    
+    # Requests in flight per API host, and tries per request, backing off
+    # exponentially with jitter (starting around retry_backoff seconds,
+    # capped at retry_max_wait). Idempotent requests retry any network error
+    # or 429/5xx; posts only retry a failed connection or a 429
+    max_concurrent_per_host = 8
+    max_attempts = 5
+    retry_backoff = 0.5
+    retry_max_wait = 30
+    
+    # Successful results replayed for identical (platform, content, time,
+    # media) posts within this window instead of posting again
+    idempotency_ttl = 600
+    idempotency_max_entries = 10_000
+    
+    # Lifetime of the Buffer profile list in the shared metadata cache
+    buffer_profiles_ttl = 3600
+    
+    # Posts waiting in the enqueue_post queue, the consumer tasks draining
+    # it, and how many queued posts one consumer takes at a time (grouped
+    # by platform so LinkedIn can go out as one batch request)
+    queue_maxsize = 10_000
+    queue_workers = 64
+    queue_batch_size = 50
+    
     def __init__(self):
         """Initialize platform API clients"""
         self.buffer_token = os.getenv('BUFFER_ACCESS_TOKEN')
@@ -21,8 +121,104 @@ class PlatformManager:
         self.linkedin_token = os.getenv('LINKEDIN_ACCESS_TOKEN')
         self.twitter_api_key = os.getenv('TWITTER_API_KEY')
         
+        # Account settings are fixed for the process lifetime
+        self.instagram_account_id = os.getenv('INSTAGRAM_ACCOUNT_ID')
+        self.linkedin_org_id = os.getenv('LINKEDIN_ORGANIZATION_ID')
+        self.facebook_page_id = os.getenv('FACEBOOK_PAGE_ID')
+        self.facebook_token = os.getenv('FACEBOOK_ACCESS_TOKEN')
+        self.twitter_bearer = os.getenv('TWITTER_BEARER_TOKEN')
+        self.twitter_api_secret = os.getenv('TWITTER_API_SECRET')
+        self.twitter_access_token = os.getenv('TWITTER_ACCESS_TOKEN')
+        self.twitter_access_secret = os.getenv('TWITTER_ACCESS_SECRET')
+        
+        # One async tweepy client for every tweet; its aiohttp session is
+        # opened on the manager's loop at first use (see _twitter_client)
+        self._tweepy = None
+        if self.twitter_api_key:
+            self._tweepy = AsyncClient(
+                bearer_token=self.twitter_bearer,
+                consumer_key=self.twitter_api_key,
+                consumer_secret=self.twitter_api_secret,
+                access_token=self.twitter_access_token,
+                access_token_secret=self.twitter_access_secret
+            )
+        
+        # Buffer profile ID per platform, parsed once
+        profile_ids = os.getenv('BUFFER_PROFILE_IDS', '').split(',')
+        self._buffer_profile_map = dict(zip(_BUFFER_PLATFORMS, profile_ids + [''] * len(_BUFFER_PLATFORMS)))
+        
+        # Platforms without a configured profile ID are looked up from
+        # Buffer's /profiles once, shared by every worker through Redis
+        self._metadata_cache = CacheStore()
+        token_hash = hashlib.blake2b((self.buffer_token or '').encode(), digest_size=8).hexdigest()
+        self._buffer_profiles_key = f"buffer:profiles:{token_hash}"
+        self._buffer_profiles: Optional[Dict[str, str]] = None
+        self._buffer_profiles_etag: Optional[str] = None
+        
+        # URLs, headers and payload parts fixed by configuration; each post
+        # only adds its own content
+        self._ig_media_url = f"{_GRAPH_API}/{self.instagram_account_id}/media"
+        self._ig_publish_url = f"{_GRAPH_API}/{self.instagram_account_id}/media_publish"
+        self._fb_feed_url = f"{_GRAPH_API}/{self.facebook_page_id}/feed"
+        self._linkedin_headers = {
+            'Authorization': f'Bearer {self.linkedin_token}',
+            'Content-Type': 'application/json'
+        }
+        self._linkedin_batch_headers = {
+            **self._linkedin_headers,
+            'X-RestLi-Method': 'BATCH_CREATE',
+            'X-Restli-Protocol-Version': '2.0.0'
+        }
+        self._linkedin_post_template = {
+            'author': f'urn:li:organization:{self.linkedin_org_id}',
+            'lifecycleState': 'PUBLISHED',
+            'visibility': {
+                'com.linkedin.ugc.MemberNetworkVisibility': 'PUBLIC'
+            }
+        }
+        
+        # The client's connections belong to one event loop; keep that loop
+        # alive in a background thread for the manager's lifetime
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(
+            target=self._loop.run_forever,
+            name="platform-manager",
+            daemon=True
+        )
+        self._loop_thread.start()
+        # One keep-alive pool for every platform; the transport retries
+        # failed connection attempts (not HTTP errors) before giving up
+        self._client = httpx.AsyncClient(
+            http2=True,
+            timeout=30,
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                retries=self.connect_retries,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry
+                )
+            )
+        )
+        self._instagram_limit = asyncio.Semaphore(self.max_concurrent_instagram)
+        self._rate_limiter = HostRateLimiter(self.max_concurrent_per_host)
+        # Only touched on the manager's loop, so no lock is needed
+        self._idem = cachetools.TTLCache(maxsize=self.idempotency_max_entries, ttl=self.idempotency_ttl)
+        # Created on the manager's loop by the first enqueue_post
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        
         logger.info("Platform Manager initialized")
     
+    def _run(self, coro: Awaitable[T]) -> T:
+        """Run a coroutine on the manager's loop and block for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+    
+    async def _arun(self, coro: Awaitable[T]) -> T:
+        """Run a coroutine on the manager's loop from any other event loop"""
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._loop))
+    
     def schedule_post(
         self,
         platform: str,
@@ -33,6 +229,11 @@ class PlatformManager:
         """
         Schedule post via Buffer or platform API
         
+        Blocking wrapper around aschedule_post, safe to call from many threads.
+        Repeating a successful call with the same arguments within
+        idempotency_ttl returns the original result (x_cache 'HIT') instead
+        of posting twice.
+        
         Args:
             platform: Target platform
             content: Post content/caption
@@ -42,39 +243,441 @@ class PlatformManager:
         Returns:
             Scheduled post data
         """
+        return self._run(self._schedule(platform, content, scheduled_time, media))
+    
+    async def aschedule_post(
+        self,
+        platform: str,
+        content: str,
+        scheduled_time: datetime,
+        media: Optional[List[str]] = None
+    ) -> Dict:
+        """
+        Schedule post via Buffer or platform API without blocking the event loop
+        
+        Args:
+            platform: Target platform
+            content: Post content/caption
+            scheduled_time: When to post
+            media: List of media URLs
+        
+        Returns:
+            Scheduled post data
+        """
+        return await self._arun(self._schedule(platform, content, scheduled_time, media))
+    
+    def enqueue_post(
+        self,
+        platform: str,
+        content: str,
+        scheduled_time: datetime,
+        media: Optional[List[str]] = None
+    ) -> Future:
+        """
+        Queue a post for the manager's consumers and return at once
+        
+        Blocks only while the queue is full. Call .result() on the returned
+        future to wait for the post, or `await asyncio.wrap_future(...)`
+        from async code. Queued posts are held in memory; close() waits for
+        them to finish.
+        
+        Args:
+            platform: Target platform
+            content: Post content/caption
+            scheduled_time: When to post
+            media: List of media URLs
+        
+        Returns:
+            Future resolving to the scheduled post data
+        """
+        return self._run(self._enqueue(platform, content, scheduled_time, media))
+    
+    async def _enqueue(
+        self,
+        platform: str,
+        content: str,
+        scheduled_time: datetime,
+        media: Optional[List[str]]
+    ) -> Future:
+        """Put a post on the queue, starting the consumers on first use"""
+        
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_maxsize)
+            self._workers = [
+                asyncio.create_task(self._consume(), name=f"platform-consumer-{i}")
+                for i in range(self.queue_workers)
+            ]
+        
+        future: Future = Future()
+        await self._queue.put((platform.lower(), content, scheduled_time, media, future))
+        return future
+    
+    async def _consume(self):
+        """Take queued posts in batches and schedule them by platform"""
+        
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.queue_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            
+            groups: Dict[str, List[Tuple[Any, ...]]] = {}
+            for entry in batch:
+                groups.setdefault(entry[0], []).append(entry)
+            
+            await asyncio.gather(*(self._consume_group(platform, entries) for platform, entries in groups.items()))
+            
+            for _ in batch:
+                self._queue.task_done()
+    
+    async def _consume_group(self, platform: str, entries: List[Tuple[Any, ...]]):
+        """Schedule one platform's share of a batch and resolve its futures"""
+        
+        try:
+            results = await self._schedule_group(platform, [entry[1:4] for entry in entries])
+        except Exception as e:
+            logger.error(f"Queued {platform} posts failed: {str(e)}")
+            results = [{'success': False, 'error': str(e)} for _ in entries]
+        
+        for entry, result in zip(entries, results):
+            future = entry[4]
+            if not future.cancelled():
+                future.set_result(result)
+    
+    async def _schedule_group(
+        self,
+        platform: str,
+        items: List[Tuple[str, datetime, Optional[List[str]]]]
+    ) -> List[Dict]:
+        """Schedule posts for one platform, as a single batch where the API allows"""
+        
+        if self.buffer_token or platform != 'linkedin' or len(items) == 1:
+            return list(await asyncio.gather(*(self._schedule(platform, *item) for item in items)))
+        
+        # Same replay rules as _schedule, applied around one batch request
+        keys = [self._idempotency_key(platform, *item) for item in items]
+        results: List[Optional[Dict]] = []
+        for key in keys:
+            cached = self._idem.get(key)
+            results.append({**cached, 'x_cache': 'HIT'} if cached is not None else None)
+        
+        pending = [i for i, result in enumerate(results) if result is None]
+        if pending:
+            created = await self._schedule_linkedin_batch([items[i] for i in pending])
+            for i, result in zip(pending, created):
+                if result.get('success'):
+                    self._idem[keys[i]] = result
+                results[i] = {**result, 'x_cache': 'MISS'}
+        
+        return results
+    
+    async def _stop_consumers(self):
+        """Let queued posts finish, then stop the consumer tasks"""
+        
+        if self._queue is None:
+            return
+        
+        await self._queue.join()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+    
+    async def schedule_post_many(self, posts: List[Dict]) -> List[Dict]:
+        """
+        Schedule many posts concurrently
+        
+        Args:
+            posts: Dicts of schedule_post keyword arguments
+        
+        Returns:
+            Scheduled post data in the same order as the posts
+        """
+        async def schedule_all() -> List[Dict]:
+            return list(await asyncio.gather(*(self._schedule(**post) for post in posts)))
+        
+        return await self._arun(schedule_all())
+    
+    async def broadcast(
+        self,
+        content: str,
+        scheduled_time: datetime,
+        media: Optional[List[str]] = None,
+        platforms: Tuple[str, ...] = _BUFFER_PLATFORMS
+    ) -> Dict[str, Dict]:
+        """
+        Post the same content to several platforms at once
+        
+        The platform calls run concurrently, so a cross-post takes about as
+        long as the slowest platform rather than the sum of all of them.
+        
+        Args:
+            content: Post content/caption
+            scheduled_time: When to post
+            media: List of media URLs
+            platforms: Target platforms
+        
+        Returns:
+            Scheduled post data keyed by platform
+        """
+        async def broadcast_all() -> List:
+            return await asyncio.gather(
+                *(self._schedule(platform, content, scheduled_time, media) for platform in platforms),
+                return_exceptions=True
+            )
+        
+        results = await self._arun(broadcast_all())
+        
+        broadcast = {}
+        for platform, result in zip(platforms, results):
+            if isinstance(result, Exception):
+                logger.error(f"Broadcast to {platform} failed: {str(result)}")
+                result = {'success': False, 'error': str(result)}
+            broadcast[platform] = result
+        return broadcast
+    
+    async def schedule_instagram_batch(
+        self,
+        items: List[Tuple[str, datetime, Optional[List[str]]]]
+    ) -> List[Dict]:
+        """
+        Post many Instagram items with their create/publish pairs overlapping
+        
+        Each item still creates its container before publishing it, but one
+        item's publish no longer holds up the next item's create. At most
+        max_concurrent_instagram items are in flight.
+        
+        Args:
+            items: (content, scheduled_time, media) tuples
+        
+        Returns:
+            Post data in the same order as the items
+        """
+        async def post_all() -> List[Dict]:
+            return list(await asyncio.gather(*(self._schedule_instagram(*item) for item in items)))
+        
+        return await self._arun(post_all())
+    
+    async def schedule_linkedin_batch(
+        self,
+        items: List[Tuple[str, datetime, Optional[List[str]]]]
+    ) -> List[Dict]:
+        """
+        Create many LinkedIn posts in a single round trip
+        
+        Uses the ugcPosts BATCH_CREATE method. Items are posted one by one
+        only if LinkedIn rejects the whole batch with a 4xx; rejected items
+        and failures that may have partly succeeded come back as errors.
+        
+        Args:
+            items: (content, scheduled_time, media) tuples
+        
+        Returns:
+            Post data in the same order as the items
+        """
+        if not items:
+            return []
+        return await self._arun(self._schedule_linkedin_batch(items))
+    
+    async def post_twitter_thread(self, tweets: List[str], as_thread: bool = True) -> List[Dict]:
+        """
+        Post several tweets, either as a reply chain or independently
+        
+        A thread has to go out in order, each tweet replying to the one
+        before, and stops at the first failure. Independent tweets are
+        posted concurrently.
+        
+        Args:
+            tweets: Tweet texts
+            as_thread: Chain the tweets as replies when True
+        
+        Returns:
+            Post data for each tweet that was attempted, in order
+        """
+        async def post_all() -> List[Dict]:
+            now = datetime.now()
+            
+            if not as_thread:
+                return list(await asyncio.gather(
+                    *(self._schedule_twitter(text, now, None) for text in tweets)
+                ))
+            
+            results = []
+            previous_id = None
+            for text in tweets:
+                result = await self._schedule_twitter(text, now, None, in_reply_to_tweet_id=previous_id)
+                results.append(result)
+                if not result['success']:
+                    break
+                previous_id = result['id']
+            return results
+        
+        return await self._arun(post_all())
+    
+    async def _schedule(
+        self,
+        platform: str,
+        content: str,
+        scheduled_time: datetime,
+        media: Optional[List[str]] = None
+    ) -> Dict:
+        """Route a post to Buffer or the platform API (runs on the manager's loop)"""
+        
+        key = self._idempotency_key(platform, content, scheduled_time, media)
+        cached = self._idem.get(key)
+        if cached is not None:
+            logger.info(f"Replaying scheduled {platform} post for {scheduled_time}")
+            return {**cached, 'x_cache': 'HIT'}
+        
         logger.info(f"Scheduling {platform} post for {scheduled_time}")
         
         if self.buffer_token:
-            return self._schedule_via_buffer(platform, content, scheduled_time, media)
+            result = await self._schedule_via_buffer(platform, content, scheduled_time, media, idempotency_key=key)
         else:
-            return self._schedule_direct(platform, content, scheduled_time, media)
+            result = await self._schedule_direct(platform, content, scheduled_time, media, idempotency_key=key)
+        
+        if result.get('success'):
+            self._idem[key] = result
+        return {**result, 'x_cache': 'MISS'}
     
-    def _schedule_via_buffer(
-        self,
+    @staticmethod
+    def _idempotency_key(
         platform: str,
         content: str,
         scheduled_time: datetime,
         media: Optional[List[str]]
-    ) -> Dict:
-        """Schedule post using Buffer API"""
+    ) -> str:
+        """Deterministic key identifying one post request"""
+        
+        raw = f"{platform.lower()}|{content}|{scheduled_time.isoformat()}|{media}"
+        return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+    
+    async def _post(self, url: str, idempotent: bool = False, **kwargs) -> httpx.Response:
+        """POST through the per-host rate limiter (see _request)"""
+        return await self._request('POST', url, idempotent=idempotent, **kwargs)
+    
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        idempotent: Optional[bool] = None,
+        **kwargs
+    ) -> httpx.Response:
+        """
+        Send a request through the per-host rate limiter
         
-        url = "https://api.bufferapp.com/1/updates/create.json"
+        Rate-limit headers on every response pause later requests to the
+        same host. Failures are retried up to max_attempts tries, after the
+        pause the host asked for (Retry-After) or else a random exponential
+        backoff. A non-idempotent request may already have taken effect after
+        a timeout or 5xx, so it is only retried when it was never sent or was
+        rejected with a 429.
         
-        # Get Buffer profile IDs
-        profile_ids = os.getenv('BUFFER_PROFILE_IDS', '').split(',')
-        platform_map = {
-            'instagram': profile_ids[0] if len(profile_ids) > 0 else '',
-            'linkedin': profile_ids[1] if len(profile_ids) > 1 else '',
-            'twitter': profile_ids[2] if len(profile_ids) > 2 else '',
-            'facebook': profile_ids[3] if len(profile_ids) > 3 else ''
-        }
+        Args:
+            method: HTTP method
+            url: Request URL
+            idempotent: Whether repeating the request is safe, defaults to
+                True for GET only
+            **kwargs: httpx request arguments
+        
+        Returns:
+            Final response (the caller checks its status)
+        
+        Raises:
+            httpx.TransportError: If the last attempt fails with a network error
+        """
+        host = httpx.URL(url).host
+        if idempotent is None:
+            idempotent = method.upper() == 'GET'
+        retry_errors = httpx.TransportError if idempotent else _UNSENT_ERRORS
+        retry_statuses = _RETRY_STATUSES if idempotent else frozenset({429})
+        backoff = wait_random_exponential(multiplier=self.retry_backoff, max=self.retry_max_wait)
+        requested: Optional[float] = None
         
-        profile_id = platform_map.get(platform.lower(), '')
+        def wait(retry_state: RetryCallState) -> float:
+            return requested if requested is not None else backoff(retry_state)
+        
+        def before_sleep(retry_state: RetryCallState):
+            # Hold back every request to the host, not just this retry
+            delay = retry_state.next_action.sleep
+            self._rate_limiter.defer(host, delay)
+            if retry_state.outcome.failed:
+                reason = str(retry_state.outcome.exception())
+            else:
+                reason = retry_state.outcome.result().status_code
+            logger.warning(f"{host} request failed ({reason}), retrying in {delay:.1f}s")
+        
+        retrying = AsyncRetrying(
+            stop=stop_after_attempt(self.max_attempts),
+            wait=wait,
+            retry=(
+                retry_if_exception_type(retry_errors)
+                | retry_if_result(lambda r: r.status_code in retry_statuses)
+            ),
+            before_sleep=before_sleep,
+            # Out of tries: return the last response, or raise the last error
+            retry_error_callback=lambda retry_state: retry_state.outcome.result()
+        )
+        
+        async for attempt in retrying:
+            with attempt:
+                requested = None
+                async with self._rate_limiter.limit(host):
+                    response = await self._client.request(method, url, **kwargs)
+                requested = self._rate_limiter.update(host, response.headers)
+            if not attempt.retry_state.outcome.failed:
+                attempt.retry_state.set_result(response)
+        
+        return response
+    
+    def _twitter_client(self) -> AsyncClient:
+        """The async tweepy client, with a pooled session on the manager's loop"""
+        
+        # Without a session tweepy opens and closes one per request
+        if self._tweepy.session is None:
+            self._tweepy.session = aiohttp.ClientSession()
+        return self._tweepy
+    
+    async def _close_twitter(self):
+        """Close the tweepy session, if one was opened"""
+        
+        if self._tweepy is not None and self._tweepy.session is not None:
+            await self._tweepy.session.close()
+    
+    def close(self):
+        """Finish queued posts, close the HTTP client and stop the manager's event loop"""
+        
+        if self._loop.is_closed():
+            return
+        
+        self._run(self._stop_consumers())
+        self._run(self._metadata_cache.close())
+        self._run(self._close_twitter())
+        self._run(self._client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join()
+        self._loop.close()
+    
+    def __enter__(self) -> 'PlatformManager':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    async def _schedule_via_buffer(
+        self,
+        platform: str,
+        content: str,
+        scheduled_time: datetime,
+        media: Optional[List[str]],
+        idempotency_key: Optional[str] = None
+    ) -> Dict:
+        """Schedule post using Buffer API"""
+        
+        profile_id = await self._buffer_profile_id(platform.lower())
         
         data = {
             'text': content,
             'profile_ids[]': [profile_id],
-            'scheduled_at': int(scheduled_time.timestamp()),
+            'scheduled_at': _to_epoch(scheduled_time),
             'access_token': self.buffer_token
         }
         
@@ -82,9 +685,10 @@ class PlatformManager:
             data['media[photo]'] = media[0]  # Buffer supports one image per post
         
         try:
-            response = requests.post(url, data=data)
+            headers = {'Idempotency-Key': idempotency_key} if idempotency_key else None
+            response = await self._post(_BUFFER_CREATE_URL, data=data, headers=headers)
             response.raise_for_status()
-            result = response.json()
+            result = orjson.loads(response.content)
             
             logger.success(f"Scheduled via Buffer: {result.get('id')}")
             return {
@@ -97,28 +701,78 @@ class PlatformManager:
             logger.error(f"Buffer API error: {str(e)}")
             return {'success': False, 'error': str(e)}
     
-    def _schedule_direct(
+    async def _buffer_profile_id(self, platform: str) -> str:
+        """Profile ID for a platform, from BUFFER_PROFILE_IDS or Buffer's profile list"""
+        
+        profile_id = self._buffer_profile_map.get(platform, '')
+        if profile_id:
+            return profile_id
+        
+        profiles = await self._metadata_cache.get_or_set(
+            self._buffer_profiles_key,
+            self._fetch_buffer_profiles,
+            self.buffer_profiles_ttl
+        )
+        return (profiles or {}).get(platform, '')
+    
+    async def _fetch_buffer_profiles(self) -> Optional[Dict[str, str]]:
+        """
+        Fetch the Buffer account's profile IDs by service
+        
+        Revalidates with the last ETag, so an unchanged list costs a 304
+        rather than a full download.
+        
+        Returns:
+            Mapping of platform to profile ID, or None on failure
+        """
+        headers = {'If-None-Match': self._buffer_profiles_etag} if self._buffer_profiles_etag else None
+        
+        try:
+            response = await self._request(
+                'GET',
+                _BUFFER_PROFILES_URL,
+                params={'access_token': self.buffer_token},
+                headers=headers
+            )
+            if response.status_code == 304 and self._buffer_profiles is not None:
+                return self._buffer_profiles
+            response.raise_for_status()
+            
+            profiles = {}
+            for profile in orjson.loads(response.content):
+                profiles.setdefault(profile.get('service'), profile.get('id'))
+            
+            self._buffer_profiles = profiles
+            self._buffer_profiles_etag = response.headers.get('etag')
+            logger.info(f"Loaded {len(profiles)} Buffer profiles")
+            return profiles
+        except Exception as e:
+            logger.error(f"Buffer profiles error: {str(e)}")
+            return None
+    
+    async def _schedule_direct(
         self,
         platform: str,
         content: str,
         scheduled_time: datetime,
-        media: Optional[List[str]]
+        media: Optional[List[str]],
+        idempotency_key: Optional[str] = None
     ) -> Dict:
         """Schedule directly via platform API"""
         
         if platform.lower() == 'instagram':
-            return self._schedule_instagram(content, scheduled_time, media)
+            return await self._schedule_instagram(content, scheduled_time, media)
         elif platform.lower() == 'linkedin':
-            return self._schedule_linkedin(content, scheduled_time, media)
+            return await self._schedule_linkedin(content, scheduled_time, media, idempotency_key=idempotency_key)
         elif platform.lower() == 'twitter':
-            return self._schedule_twitter(content, scheduled_time, media)
+            return await self._schedule_twitter(content, scheduled_time, media)
         elif platform.lower() == 'facebook':
-            return self._schedule_facebook(content, scheduled_time, media)
+            return await self._schedule_facebook(content, scheduled_time, media)
         else:
             logger.error(f"Unsupported platform: {platform}")
             return {'success': False, 'error': 'Unsupported platform'}
     
-    def _schedule_instagram(
+    async def _schedule_instagram(
         self,
         content: str,
         scheduled_time: datetime,
@@ -126,10 +780,6 @@ class PlatformManager:
     ) -> Dict:
         """Schedule Instagram post via Graph API"""
         
-        # Instagram API endpoint
-        account_id = os.getenv('INSTAGRAM_ACCOUNT_ID')
-        url = f"https://graph.facebook.com/v18.0/{account_id}/media"
-        
         params = {
             'caption': content,
             'access_token': self.instagram_token
@@ -139,20 +789,23 @@ class PlatformManager:
             params['image_url'] = media[0]
         
         try:
-            # Create media container
-            response = requests.post(url, params=params)
-            response.raise_for_status()
-            media_id = response.json()['id']
-            
-            # Publish (Instagram doesn't support scheduling via API without Business account)
-            publish_url = f"https://graph.facebook.com/v18.0/{account_id}/media_publish"
-            publish_params = {
-                'creation_id': media_id,
-                'access_token': self.instagram_token
-            }
-            
-            publish_response = requests.post(publish_url, params=publish_params)
-            publish_response.raise_for_status()
+            async with self._instagram_limit:
+                # Create media container; an unpublished duplicate is harmless,
+                # so this step retries like a read
+                response = await self._post(self._ig_media_url, idempotent=True, params=params)
+                response.raise_for_status()
+                media_id = _response_id(response)
+                if not media_id:
+                    raise ValueError("Instagram returned no media container id")
+                
+                # Publish (Instagram doesn't support scheduling via API without Business account)
+                publish_params = {
+                    'creation_id': media_id,
+                    'access_token': self.instagram_token
+                }
+                
+                publish_response = await self._post(self._ig_publish_url, params=publish_params)
+                publish_response.raise_for_status()
             
             logger.success(f"Posted to Instagram: {media_id}")
             return {
@@ -164,42 +817,25 @@ class PlatformManager:
             logger.error(f"Instagram API error: {str(e)}")
             return {'success': False, 'error': str(e)}
     
-    def _schedule_linkedin(
+    async def _schedule_linkedin(
         self,
         content: str,
         scheduled_time: datetime,
-        media: Optional[List[str]]
+        media: Optional[List[str]],
+        idempotency_key: Optional[str] = None
     ) -> Dict:
         """Schedule LinkedIn post"""
         
-        org_id = os.getenv('LINKEDIN_ORGANIZATION_ID')
-        url = "https://api.linkedin.com/v2/ugcPosts"
-        
-        headers = {
-            'Authorization': f'Bearer {self.linkedin_token}',
-            'Content-Type': 'application/json'
-        }
+        headers = self._linkedin_headers
+        if idempotency_key:
+            headers = {**headers, 'Idempotency-Key': idempotency_key}
         
-        post_data = {
-            'author': f'urn:li:organization:{org_id}',
-            'lifecycleState': 'PUBLISHED',
-            'specificContent': {
-                'com.linkedin.ugc.ShareContent': {
-                    'shareCommentary': {
-                        'text': content
-                    },
-                    'shareMediaCategory': 'NONE'
-                }
-            },
-            'visibility': {
-                'com.linkedin.ugc.MemberNetworkVisibility': 'PUBLIC'
-            }
-        }
+        post_data = self._linkedin_post_data(content)
         
         try:
-            response = requests.post(url, headers=headers, json=post_data)
+            response = await self._post(_LINKEDIN_POSTS_URL, headers=headers, content=orjson.dumps(post_data))
             response.raise_for_status()
-            result = response.json()
+            result = orjson.loads(response.content)
             
             logger.success(f"Posted to LinkedIn: {result.get('id')}")
             return {
@@ -211,29 +847,94 @@ class PlatformManager:
             logger.error(f"LinkedIn API error: {str(e)}")
             return {'success': False, 'error': str(e)}
     
-    def _schedule_twitter(
+    async def _schedule_linkedin_batch(
+        self,
+        items: List[Tuple[str, datetime, Optional[List[str]]]]
+    ) -> List[Dict]:
+        """
+        Create many LinkedIn posts with one BATCH_CREATE request
+        
+        Posts go out one by one only when LinkedIn rejects the batch request
+        itself with a 4xx, so nothing in it was created. After a network
+        error, 429 or 5xx some posts may already exist, so they are reported
+        as failed rather than posted again.
+        """
+        payload = {'elements': [self._linkedin_post_data(content) for content, _, _ in items]}
+        
+        try:
+            response = await self._post(
+                _LINKEDIN_POSTS_URL,
+                headers=self._linkedin_batch_headers,
+                content=orjson.dumps(payload)
+            )
+        except Exception as e:
+            logger.error(f"LinkedIn batch failed: {str(e)}")
+            return [{'success': False, 'error': str(e)} for _ in items]
+        
+        if 400 <= response.status_code < 500 and response.status_code != 429:
+            logger.warning(f"LinkedIn batch rejected ({response.status_code}), posting one by one")
+            return list(await asyncio.gather(*(self._schedule_linkedin(*item) for item in items)))
+        
+        try:
+            response.raise_for_status()
+            elements = orjson.loads(response.content).get('elements', [])
+        except Exception as e:
+            logger.error(f"LinkedIn batch failed: {str(e)}")
+            return [{'success': False, 'error': str(e)} for _ in items]
+        
+        results: List[Dict] = []
+        for i in range(len(items)):
+            element = elements[i] if i < len(elements) else {}
+            if 200 <= element.get('status', 0) < 300:
+                logger.success(f"Posted to LinkedIn: {element.get('id')}")
+                results.append({
+                    'success': True,
+                    'id': element.get('id'),
+                    'platform': 'linkedin'
+                })
+            else:
+                error = element.get('error') or 'No result in LinkedIn batch response'
+                logger.error(f"LinkedIn batch element failed: {error}")
+                results.append({'success': False, 'error': str(error)})
+        
+        return results
+    
+    def _linkedin_post_data(self, content: str) -> Dict:
+        """UGC post body for a piece of content"""
+        
+        # The fixed parts are shared with the template; only the content is new
+        return {
+            **self._linkedin_post_template,
+            'specificContent': {
+                'com.linkedin.ugc.ShareContent': {
+                    'shareCommentary': {
+                        'text': content
+                    },
+                    'shareMediaCategory': 'NONE'
+                }
+            }
+        }
+    
+    async def _schedule_twitter(
         self,
         content: str,
         scheduled_time: datetime,
-        media: Optional[List[str]]
+        media: Optional[List[str]],
+        in_reply_to_tweet_id: Optional[str] = None
     ) -> Dict:
         """Schedule Twitter/X post"""
         
         # Using Twitter API v2
-        import tweepy
+        if self._tweepy is None:
+            logger.error("Twitter API error: TWITTER_API_KEY not configured")
+            return {'success': False, 'error': 'Twitter credentials not configured'}
         
         try:
-            client = tweepy.Client(
-                bearer_token=os.getenv('TWITTER_BEARER_TOKEN'),
-                consumer_key=self.twitter_api_key,
-                consumer_secret=os.getenv('TWITTER_API_SECRET'),
-                access_token=os.getenv('TWITTER_ACCESS_TOKEN'),
-                access_token_secret=os.getenv('TWITTER_ACCESS_SECRET')
+            response = await self._twitter_client().create_tweet(
+                text=content,
+                in_reply_to_tweet_id=in_reply_to_tweet_id
             )
             
-            # Tweet
-            response = client.create_tweet(text=content)
-            
             logger.success(f"Posted to Twitter: {response.data['id']}")
             return {
                 'success': True,
@@ -244,7 +945,7 @@ class PlatformManager:
             logger.error(f"Twitter API error: {str(e)}")
             return {'success': False, 'error': str(e)}
     
-    def _schedule_facebook(
+    async def _schedule_facebook(
         self,
         content: str,
         scheduled_time: datetime,
@@ -252,12 +953,9 @@ class PlatformManager:
     ) -> Dict:
         """Schedule Facebook post"""
         
-        page_id = os.getenv('FACEBOOK_PAGE_ID')
-        url = f"https://graph.facebook.com/v18.0/{page_id}/feed"
-        
         params = {
             'message': content,
-            'access_token': os.getenv('FACEBOOK_ACCESS_TOKEN'),
+            'access_token': self.facebook_token,
             'published': True
         }
         
@@ -265,14 +963,14 @@ class PlatformManager:
             params['link'] = media[0]
         
         try:
-            response = requests.post(url, params=params)
+            response = await self._post(self._fb_feed_url, params=params)
             response.raise_for_status()
-            result = response.json()
+            post_id = _response_id(response)
             
-            logger.success(f"Posted to Facebook: {result.get('id')}")
+            logger.success(f"Posted to Facebook: {post_id}")
             return {
                 'success': True,
-                'id': result.get('id'),
+                'id': post_id,
                 'platform': 'facebook'
             }
         except Exception as e:
@@ -282,14 +980,13 @@ class PlatformManager:
 
 if __name__ == "__main__":
     # Test platform manager
-    manager = PlatformManager()
-    
-    # Example schedule
-    result = manager.schedule_post(
-        platform='twitter',
-        content='Testing automated posting! #AI #Automation',
-        scheduled_time=datetime.now(),
-        media=None
-    )
-    
-    print(f"Result: {result}")
+    with PlatformManager() as manager:
+        # Example schedule
+        result = manager.schedule_post(
+            platform='twitter',
+            content='Testing automated posting! #AI #Automation',
+            scheduled_time=datetime.now(),
+            media=None
+        )
+        
+        print(f"Result: {result}")
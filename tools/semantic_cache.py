@@ -0,0 +1,368 @@
+"""
+Semantic Cache - Reuses LLM results for near-duplicate inputs
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+import orjson
+from loguru import logger
+
+
+class SemanticCache:
+    """
+    Embedding-similarity cache for short texts such as comments
+
+    Entries are grouped into namespaces so results for one kind of call
+    (e.g. classifications) never answer another (e.g. replies). Each
+    namespace holds a matrix of L2-normalised embeddings, so cosine
+    similarity is a single matrix-vector product.
+
+    Embeddings come from a local sentence-transformers model unless
+    embedding_backend is 'openai'; there is no silent switch to a paid API.
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.92,
+        ttl_seconds: Optional[float] = 7 * 24 * 3600,
+        max_entries: int = 10000,
+        persist_path: Optional[str] = None,
+        model_name: Optional[str] = None,
+        persist_every: int = 50,
+        dtype=np.float32,
+        max_namespaces: int = 64,
+        embedding_backend: str = 'local'
+    ):
+        """
+        Initialize semantic cache
+
+        Args:
+            similarity_threshold: Minimum cosine similarity for a hit
+            ttl_seconds: Entry lifetime, None to keep entries forever
+            max_entries: Per-namespace cap, oldest entries dropped first
+            persist_path: .npz file used to keep the cache across restarts
+            model_name: Embedding model, defaults to all-MiniLM-L6-v2 (local)
+                or text-embedding-3-small (openai)
+            persist_every: Save to disk after this many new entries
+            dtype: Storage dtype for embeddings (np.float16 halves memory)
+            max_namespaces: Namespace cap, the oldest namespace dropped first
+            embedding_backend: 'local' (sentence-transformers) or 'openai'
+        """
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.persist_path = persist_path
+        self.embedding_backend = embedding_backend
+        self.model_name = model_name or (
+            'text-embedding-3-small' if embedding_backend == 'openai' else 'all-MiniLM-L6-v2'
+        )
+        self.persist_every = persist_every
+        self.dtype = dtype
+        self.max_namespaces = max_namespaces
+
+        self._embedder = None
+        self._embedder_error: Optional[Exception] = None
+        # Saved with the data; a file written by another model is discarded
+        self._embedder_id = f"{embedding_backend}:{self.model_name}"
+        self._lock = threading.Lock()
+        self._namespaces: Dict[str, Dict] = {}
+        self._unsaved = 0
+
+        if persist_path and os.path.exists(persist_path):
+            self._load()
+
+        logger.info(f"Semantic cache initialized (threshold={similarity_threshold})")
+
+    def _get_embedder(self) -> Callable[[List[str]], np.ndarray]:
+        """Load the embedding backend on first use"""
+
+        if self._embedder is not None:
+            return self._embedder
+
+        # Fail fast (and warn only once) when the backend cannot load
+        if self._embedder_error is not None:
+            raise self._embedder_error
+
+        try:
+            if self.embedding_backend == 'openai':
+                from langchain_openai import OpenAIEmbeddings
+
+                embeddings = OpenAIEmbeddings(model=self.model_name)
+                self._embedder = lambda texts: np.asarray(embeddings.embed_documents(texts))
+                logger.info(f"Semantic cache using OpenAI embeddings ({self.model_name})")
+            else:
+                from sentence_transformers import SentenceTransformer
+
+                model = SentenceTransformer(self.model_name)
+                self._embedder = lambda texts: model.encode(texts, convert_to_numpy=True)
+                logger.info(f"Semantic cache using local model {self.model_name}")
+        except Exception as e:
+            self._embedder_error = e
+            logger.warning(f"Semantic cache disabled, {self.embedding_backend} embeddings unavailable: {str(e)}")
+            raise
+
+        return self._embedder
+
+    def embed_many(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts as L2-normalised float32 rows
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Array of shape (len(texts), dim)
+        """
+        vectors = np.asarray(self._get_embedder()(list(texts)), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def lookup(self, namespace: str, embedding: np.ndarray) -> Optional[Any]:
+        """
+        Find the cached value closest to an embedding
+
+        Args:
+            namespace: Cache namespace
+            embedding: Normalised embedding from embed_many
+
+        Returns:
+            Cached value, or None when nothing is similar enough
+        """
+        with self._lock:
+            entry = self._namespaces.get(namespace)
+            if entry is None:
+                return None
+
+            self._evict_expired(entry)
+            if not entry['values']:
+                return None
+
+            if entry['embeddings'].shape[1] != embedding.shape[0]:
+                logger.warning(f"Semantic cache namespace {namespace} has another embedding size, dropping it")
+                del self._namespaces[namespace]
+                return None
+
+            scores = entry['embeddings'] @ embedding
+            best = int(np.argmax(scores))
+            if scores[best] < self.similarity_threshold:
+                return None
+
+            return entry['values'][best]
+
+    def add(self, namespace: str, embedding: np.ndarray, value: Any):
+        """
+        Store a value under an embedding
+
+        Args:
+            namespace: Cache namespace
+            embedding: Normalised embedding from embed_many
+            value: JSON-serialisable value to return for similar inputs
+        """
+        if self._insert(namespace, embedding, value):
+            self.save()
+
+    async def aadd(self, namespace: str, embedding: np.ndarray, value: Any):
+        """
+        Async variant of add; saving to disk runs in a worker thread
+
+        Args:
+            namespace: Cache namespace
+            embedding: Normalised embedding from embed_many
+            value: JSON-serialisable value to return for similar inputs
+        """
+        if self._insert(namespace, embedding, value):
+            await asyncio.to_thread(self.save)
+
+    def _insert(self, namespace: str, embedding: np.ndarray, value: Any) -> bool:
+        """Store a value in memory; returns whether a save to disk is due"""
+
+        embedding = embedding.astype(self.dtype)
+
+        with self._lock:
+            entry = self._namespaces.get(namespace)
+            if entry is None:
+                # Namespaces are kept in creation order
+                while len(self._namespaces) >= self.max_namespaces:
+                    dropped = next(iter(self._namespaces))
+                    del self._namespaces[dropped]
+                    logger.debug(f"Semantic cache dropped namespace {dropped}")
+
+                entry = self._namespaces[namespace] = {
+                    'embeddings': embedding[np.newaxis, :],
+                    'created': [time.time()],
+                    'values': [value]
+                }
+            else:
+                entry['embeddings'] = np.vstack([entry['embeddings'], embedding])
+                entry['created'].append(time.time())
+                entry['values'].append(value)
+
+                overflow = len(entry['values']) - self.max_entries
+                if overflow > 0:
+                    self._drop_oldest(entry, overflow)
+
+            self._unsaved += 1
+            return bool(self.persist_path) and self._unsaved >= self.persist_every
+
+    def get_or_compute(
+        self,
+        text: str,
+        compute: Callable[[], Optional[Any]],
+        namespace: str = 'default'
+    ) -> Optional[Any]:
+        """
+        Return a cached value for a similar text, or compute and store it
+
+        Falls back to compute() alone if embedding fails.
+
+        Args:
+            text: Input text
+            compute: Produces the value on a cache miss
+            namespace: Cache namespace
+
+        Returns:
+            Cached or freshly computed value
+        """
+        # The backend already failed to load and was reported once
+        if self._embedder_error is not None:
+            return compute()
+
+        try:
+            embedding = self.embed_many([text])[0]
+        except Exception as e:
+            logger.warning(f"Semantic cache embedding failed: {str(e)}")
+            return compute()
+
+        cached = self.lookup(namespace, embedding)
+        if cached is not None:
+            logger.debug(f"Semantic cache hit in {namespace}")
+            return cached
+
+        value = compute()
+        if value is not None:
+            self.add(namespace, embedding, value)
+        return value
+
+    async def aget_or_compute(
+        self,
+        text: str,
+        compute: Callable[[], Awaitable[Optional[Any]]],
+        namespace: str = 'default'
+    ) -> Optional[Any]:
+        """
+        Async variant of get_or_compute
+
+        Embedding runs in a worker thread so the event loop stays free.
+
+        Args:
+            text: Input text
+            compute: Coroutine factory producing the value on a cache miss
+            namespace: Cache namespace
+
+        Returns:
+            Cached or freshly computed value
+        """
+        # The backend already failed to load and was reported once
+        if self._embedder_error is not None:
+            return await compute()
+
+        try:
+            embedding = (await asyncio.to_thread(self.embed_many, [text]))[0]
+        except Exception as e:
+            logger.warning(f"Semantic cache embedding failed: {str(e)}")
+            return await compute()
+
+        cached = self.lookup(namespace, embedding)
+        if cached is not None:
+            logger.debug(f"Semantic cache hit in {namespace}")
+            return cached
+
+        value = await compute()
+        if value is not None:
+            await self.aadd(namespace, embedding, value)
+        return value
+
+    def _evict_expired(self, entry: Dict):
+        """Drop entries older than the TTL (entries are in insertion order)"""
+
+        if self.ttl_seconds is None or not entry['created']:
+            return
+
+        cutoff = time.time() - self.ttl_seconds
+        expired = 0
+        for created in entry['created']:
+            if created >= cutoff:
+                break
+            expired += 1
+
+        if expired:
+            self._drop_oldest(entry, expired)
+
+    @staticmethod
+    def _drop_oldest(entry: Dict, count: int):
+        """Remove the first count entries of a namespace"""
+
+        entry['embeddings'] = entry['embeddings'][count:]
+        entry['created'] = entry['created'][count:]
+        entry['values'] = entry['values'][count:]
+
+    def save(self):
+        """Write the cache to persist_path"""
+
+        if not self.persist_path:
+            return
+
+        with self._lock:
+            names = list(self._namespaces)
+            arrays = {}
+            for i, name in enumerate(names):
+                arrays[f'embeddings_{i}'] = self._namespaces[name]['embeddings']
+                arrays[f'created_{i}'] = np.asarray(self._namespaces[name]['created'])
+
+            meta = {
+                'embedder': self._embedder_id,
+                'dim': int(arrays['embeddings_0'].shape[1]) if names else None,
+                'namespaces': names,
+                'values': [self._namespaces[name]['values'] for name in names]
+            }
+            arrays['meta'] = np.frombuffer(orjson.dumps(meta), dtype=np.uint8)
+            self._unsaved = 0
+
+        directory = os.path.dirname(self.persist_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Write to a temp file first so a crash never leaves a truncated cache
+        tmp_path = f"{self.persist_path}.tmp.npz"
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, self.persist_path)
+
+        logger.debug(f"Semantic cache saved to {self.persist_path}")
+
+    def _load(self):
+        """Read a cache previously written by save()"""
+
+        try:
+            with np.load(self.persist_path) as data:
+                meta = orjson.loads(data['meta'].tobytes())
+                if meta.get('embedder') != self._embedder_id:
+                    logger.info(f"Ignoring semantic cache built with {meta.get('embedder') or 'an unknown model'}")
+                    return
+                for i, name in enumerate(meta['namespaces']):
+                    self._namespaces[name] = {
+                        'embeddings': data[f'embeddings_{i}'].astype(self.dtype),
+                        'created': data[f'created_{i}'].tolist(),
+                        'values': meta['values'][i]
+                    }
+            # Files written before max_namespaces may hold more
+            for name in list(self._namespaces)[:-self.max_namespaces]:
+                del self._namespaces[name]
+            logger.info(f"Loaded semantic cache from {self.persist_path}")
+        except Exception as e:
+            logger.warning(f"Could not load semantic cache: {str(e)}")
+            self._namespaces = {}